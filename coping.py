@@ -1,11 +1,21 @@
 import streamlit as st
 import pyvista as pv
-from copingBasic import set_camera_view, add_arrow_axes, create_volume
-from copingData import get_coping_data
-from copingRebar import coping_rebar
-from stpyvista import stpyvista
+from copingBasic import set_camera_view, add_arrow_axes, create_volume, mirror_matrices, color_map
+from copingRebar import coping_rebar, affected_groups, rebar_layout
+from copingMerged import merged_rebar, select_keys, rebar_subset
+from copingCache import geometry_cache, cached_coping_data, file_hash, warm_up
+from copingPiers import read_piers, pier_designs, piers_takeoff
+from copingTakeoff import rebar_takeoff, takeoff_csv, takeoff_xlsx
+from copingClash import rebar_clash, clash_summary
+from copingCover import rebar_cover, cover_summary
+from copingViewer import viewer_glb, viewer_html, table_marks
+from copingProfile import span, start_profile, stop_profile
+from copingScene import Scene
+import streamlit.components.v1 as components
+import pandas as pd
 import time
 import os
+import threading
 import warnings
 import platform
 from pyvista.core.errors import PyVistaFutureWarning
@@ -15,19 +25,46 @@ st.set_page_config(page_title="3D Coping Model", layout="wide")
 warnings.filterwarnings("ignore", category=UserWarning)
 warnings.filterwarnings("ignore", category=PyVistaFutureWarning)
 
-# 환경별 설정
-if platform.system() == 'Linux':  # Streamlit Cloud 환경
-    os.environ["PYVISTA_OFF_SCREEN"] = "true"
-    os.environ["PYVISTA_USE_IPYVTK"] = "true"
-    os.environ["DISPLAY"] = ":99"
-    os.environ["MESA_GL_VERSION_OVERRIDE"] = "3.3"
-    pv.OFF_SCREEN = True
-    pv.start_xvfb()
-else:  # 로컬 Windows 환경
-    plotter = pv.Plotter(off_screen=True)
-    pv.OFF_SCREEN = False
-
-plotter = pv.Plotter(window_size=[1600, 1100], border=False)  # plotter.set_background("black")
+# 환경별 설정 : 서버 프로세스당 한 번 (Xvfb 는 실행할 때마다 다시 띄우면 매번 몇 초씩 기다림)
+@st.cache_resource
+def start_display():
+    if platform.system() == 'Linux':  # Streamlit Cloud 환경
+        os.environ["PYVISTA_OFF_SCREEN"] = "true"
+        os.environ["PYVISTA_USE_IPYVTK"] = "true"
+        os.environ["DISPLAY"] = ":99"
+        os.environ["MESA_GL_VERSION_OVERRIDE"] = "3.3"
+        pv.OFF_SCREEN = True
+        pv.start_xvfb()
+    else:  # 로컬 Windows 환경
+        pv.OFF_SCREEN = False
+    return platform.system()
+
+start_display()
+
+# 서버 시작 시 미리 준비 (프로세스당 한 번, 백그라운드) : 기본 입력 모델 생성 + stpyvista (panel) import
+#   COPING_WARMUP=0 이면 사용 안 함
+@st.cache_resource
+def start_warm_up(_cache):
+    def run():
+        warm_up(_cache)
+        import stpyvista  # noqa: F401
+    thread = threading.Thread(target=run, name='coping-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+if os.environ.get('COPING_WARMUP', '1') != '0':
+    start_warm_up(geometry_cache())
+
+# 철근 그룹 동시 생성 (서버 설정) : COPING_REBAR_EXECUTOR=thread 또는 process, COPING_REBAR_WORKERS=개수 (기본 CPU 수)
+rebar_executor = os.environ.get('COPING_REBAR_EXECUTOR') or None
+rebar_workers = int(os.environ['COPING_REBAR_WORKERS']) if os.environ.get('COPING_REBAR_WORKERS') else None
+
+# plotter 는 세션마다 한 번 만들어 다시 사용 (렌더 창을 동시에 접속한 세션끼리 공유하지 않도록 세션 단위)
+#   scene : 이름 붙은 actor 를 다시 실행해도 유지 (속성만 변경, 필터는 보이기 / 숨기기)
+if 'plotter' not in st.session_state:
+    st.session_state['plotter'] = pv.Plotter(window_size=[1600, 1100], border=False)  # plotter.set_background("black")
+    st.session_state['scene'] = Scene(st.session_state['plotter'])
+plotter, scene = st.session_state['plotter'], st.session_state['scene']
 # ✅ 상단 여백 제거하는 CSS 적용
 st.markdown( """
     <style>
@@ -47,8 +84,8 @@ st.markdown( """
     unsafe_allow_html=True
 )
 
-# ✅ 탭 생성
-tab1, tab2, tab3, tab4 = st.tabs(["🏗️ 전체 뷰", "🧱 코핑 뷰", "🏛️ 기둥 뷰", "⬛ 기초 뷰"])
+# ✅ 뷰 영역 (탭 또는 뷰 선택 버튼은 아래에서 생성)
+view_area = st.container()
 
 start_time = time.time()
 with st.sidebar:    
@@ -74,7 +111,7 @@ with st.sidebar:
                 file_name="coping_input.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
-            uploaded_file = st.file_uploader("Upload Excel file", type=['xlsx'])
+            uploaded_file = st.file_uploader("Upload Excel file", type=['xlsx', 'npz'], help="npz : 아래에서 저장한 모델 파일 (엑셀 읽기 생략)")
     with col[1]:
         with st.expander(":green[카메라 위치 (iso, top 뷰 등)]"):
             camera_position = st.radio(":orange[카메라 위치]", ["iso", "Top", "Bottom", "Front", 'Back', 'Right', 'Left'], index=0)
@@ -84,16 +121,34 @@ with st.sidebar:
         camera_projection = st.radio(":orange[카메라 투영*]", ["orthographic", "perspective"], horizontal=True, index=0)
     with col[1]:
         model_symmetry = st.checkbox(":orange[전체 모델 (대칭)]", value=False)
-    st.write('###### :blue[*도면은 orthographic(직교 뷰)로 봐야 하지만, 현재 웹 표시는 원근 뷰만 지원 (다소 찌글어 보일수 있음)]')
-    st.write('###### :blue[**조만간 orthographic(직교 뷰)도 지원될 것으로 보임]')
+    lazy_view = st.checkbox(":orange[선택한 뷰만 렌더링]", value=True, help="해제하면 4개 탭을 모두 생성 (실행 시간 약 4배)")
+    web_viewer = st.checkbox(":orange[브라우저 뷰어 (WebGL)]", value=False,
+        help="형상을 GLB (int16 좌표)로 한 번만 보내고 부위 / 타입 / 직경 필터, 카메라, 투명도, 직교 투영은 뷰어 도구 막대에서 변경 (사이드바 값은 사용 안 함, 인스턴싱을 켜면 전송량 감소)")
+    profile_on = st.checkbox(":orange[단계별 실행 시간 (debug)]", value=False, help="엑셀 읽기, 철근 그룹별 생성, add_mesh, stpyvista 등 구간별 시간 / 메모리 기록")
+    if profile_on:
+        start_profile()
+    if not web_viewer:   # 브라우저 뷰어는 직교 뷰 지원
+        st.write('###### :blue[*도면은 orthographic(직교 뷰)로 봐야 하지만, 현재 웹 표시는 원근 뷰만 지원 (다소 찌글어 보일수 있음)]')
+        st.write('###### :blue[**조만간 orthographic(직교 뷰)도 지원될 것으로 보임]')
     
     col = st.columns(2)
     with col[0]:
         rebar_scale = st.number_input(":orange[Rebar Scale*]", min_value=0., value=1., step=1., format="%.f")
+        spiral_tie = st.checkbox(":orange[나선 띠철근]", value=False,
+            help="기둥 띠철근을 표의 간격을 피치로 하는 나선 1개로 표시 (물량 / 간섭 / 피복 검토는 원형 고리 기준)")
     with col[1]:
-        pass
+        rebar_instanced = st.checkbox(":orange[철근 인스턴싱]", value=False, help="반복 배치 철근을 형상 1개 + 이동량으로 표시 (메모리 절약)")
+        rebar_merged = st.checkbox(":orange[철근 단일 메시]", value=False,
+            help="모든 철근을 PolyData 1개 (actor 1개) 로 표시, 타입 / 직경 / 뷰 필터는 셀 구간 잘라내기 (인스턴싱 철근은 펼쳐서 합침)")
     st.write('###### :blue[*0이면 선만 표시, 1이면 실제 직경, 2이면 2배 크게 표시 등]')
 
+    col = st.columns(2)
+    with col[0]:
+        rebar_lod = st.checkbox(":orange[자동 LOD]", value=False, help="철근 수와 화면상 굵기로 단면 분할 수 결정, 예산 초과 시 선으로 표시")
+    with col[1]:
+        triangle_budget = st.number_input(":orange[삼각형 예산 (천 개)]", min_value=10, value=300, step=50, disabled=not rebar_lod)
+    triangle_budget = triangle_budget * 1000 if rebar_lod else None
+
     col = st.columns(2)
     with col[0]:
         rebar_opacity = st.number_input(":orange[Rebar Opacity]", min_value=0., value=1., step=0.1, max_value=1., format="%.1f")
@@ -107,7 +162,9 @@ with st.sidebar:
     with col[1]:
         volume_line_width = st.number_input(":orange[Volume Line Width]", min_value=1., value=3., step=1., format="%.f")
 
-concrete_data = get_coping_data(uploaded_file)
+# ✅ 캐시 : 입력 파일 해시 → 데이터, 데이터 해시 → 볼륨, (데이터 해시, rebar_scale) → 철근
+cache = geometry_cache()
+concrete_data, data_key = cached_coping_data(cache, uploaded_file)
 length = concrete_data['length']
 column = concrete_data['column']
 
@@ -117,16 +174,31 @@ outer_points = concrete_data['coping']['xyz']
 column_rebar = concrete_data['column_rebar']
 footing = concrete_data['footing']
 
-color_map = {'coping_outer': 'red', 'coping_x': 'magenta', 'coping_z': 'green', 'coping_y': 'blue',
-    'column_tie': 'purple', 'column_rebar': 'cyan', 'column_cross': 'red',
-    'footing_top': 'green', 'footing_bottom': 'orange', 'footing_ver': 'purple'}
-
-volumes, lines = create_volume(concrete_data)
-rebar = coping_rebar(rebar_scale, concrete_data)
+changed_sections = concrete_data.changed_sections(st.session_state.get('previous_data'))
+st.session_state['previous_data'] = concrete_data
+
+# ✅ 다중 교각 : 입력 시트에 Piers 표가 있으면 선택 가능 (입력값이 같은 교각은 형상 1벌 + 배치 행렬)
+piers = cache.get_or_create(('piers', file_hash(uploaded_file)), lambda: read_piers(uploaded_file))
+multi_pier = bool(piers) and st.sidebar.checkbox(f":orange[다중 교각 ({len(piers)}개)]", value=False,
+    help="Piers 표의 위치 / 회전 / 입력값 변경으로 전체 교각 표시")
+if multi_pier:
+    designs = pier_designs(concrete_data, piers)
+else:
+    designs = [{'model': concrete_data, 'digest': data_key, 'piers': [], 'matrices': None}]
+
+for design in designs:
+    design['volumes'], design['lines'] = cache.get_or_create(('volume', design['digest']), lambda: create_volume(design['model']))
+    # 철근은 그룹별로 캐시 (입력 구역이 바뀐 그룹만 다시 생성)
+    design['rebar'] = coping_rebar(rebar_scale, design['model'], instanced=rebar_instanced, triangle_budget=triangle_budget, cache=cache,
+                                  executor=rebar_executor, workers=rebar_workers, spiral=spiral_tie)
+    if rebar_merged:
+        design['merged'] = cache.get_or_create(('rebar_merged', design['digest'], rebar_scale, triangle_budget, spiral_tie),
+                                               lambda: merged_rebar(design['rebar'], rebar_layout(design['model'])))
+volumes, lines, rebar = designs[0]['volumes'], designs[0]['lines'], designs[0]['rebar']
 
 # ✅ 중복 없는 리바 타입 & 직경 목록 생성 후 'All' 추가
-unique_types = ["All"] + sorted(set(r_type for r_type, _ in rebar))
-unique_dias = ['All'] + sorted(list(set(int(dia) for _, dia in rebar)))
+unique_types = ["All"] + sorted(set(r_type for design in designs for r_type, _ in design['rebar']))
+unique_dias = ['All'] + sorted(list(set(int(dia) for design in designs for _, dia in design['rebar'])))
 
 with st.sidebar:
     col = st.columns(2)
@@ -135,101 +207,183 @@ with st.sidebar:
     with col[1]:
         rebar_dia = st.radio(":orange[철근 직경]", options=unique_dias)
 
+    # ✅ 철근 물량 (메시 없이 배치 좌표로 계산)
+    with st.expander(":green[철근 물량 (개수, 길이, 중량)]"):
+        takeoff = piers_takeoff(designs) if multi_pier else rebar_takeoff(concrete_data)
+        st.dataframe(takeoff, hide_index=True, column_config={
+            'length_m': st.column_config.NumberColumn(format="%.1f"),
+            'unit_weight_kg_m': st.column_config.NumberColumn(format="%.3f"),
+            'mass_kg': st.column_config.NumberColumn(format="%.1f")})
+        st.write(f"###### :blue[총 중량 : {takeoff['mass_kg'].sum() / 1000:.2f} ton]")
+        col = st.columns(2)
+        with col[0]:
+            st.download_button("CSV 다운로드", data=takeoff_csv(takeoff), file_name="rebar_takeoff.csv", mime="text/csv")
+        with col[1]:
+            st.download_button("Excel 다운로드", data=takeoff_xlsx(takeoff), file_name="rebar_takeoff.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    # ✅ 철근 간섭 / 순간격 검토 (설계별 결과 캐시)
+    clashes = {}
+    with st.expander(":green[철근 간섭 검토]"):
+        col = st.columns(2)
+        with col[0]:
+            clash_on = st.checkbox(":orange[검토 실행]", value=False, help="철근을 캡슐(선분 + 반경)로 보고 격자 색인으로 가까운 쌍만 비교")
+        with col[1]:
+            clearance = st.number_input(":orange[최소 순간격 (mm)]", min_value=0., value=25., step=5., format="%.f",
+                help="거의 평행한 철근끼리의 순간격 기준 (교차하며 닿는 철근은 제외)")
+        clash_marks = st.checkbox(":orange[간섭 위치 3D 표시]", value=True, disabled=not clash_on)
+        clash_crossings = st.checkbox(":orange[같은 층 교차 철근 포함]", value=False, disabled=not clash_on,
+            help="같은 층 (코핑 철근망, 같은 종류의 격자 배근) 에서 중심선이 만나는 교차 철근을 crossing 으로 따로 표시 (해제하면 제외), "
+                 "다른 층의 철근이 만나면 간섭 (clash)")
+        if clash_on:
+            for design in designs:
+                clashes[design['digest']] = cache.get_or_create(('clash', design['digest'], clearance, clash_crossings),
+                    lambda: rebar_clash(design['model'], clearance=clearance, crossings=clash_crossings))
+            # 다중 교각 : 설계별 결과에 교각 이름 추가 (같은 설계의 교각은 결과 공유)
+            clash_table = pd.concat([clashes[design['digest']].assign(piers=', '.join(design['piers']))
+                                     for design in designs], ignore_index=True)
+            st.dataframe(clash_summary(clash_table), hide_index=True, column_config={
+                'min_clear': st.column_config.NumberColumn(format="%.1f")})
+            st.write(f"###### :blue[간섭 {(clash_table['kind'] == 'clash').sum()}개, "
+                     f"순간격 부족 {(clash_table['kind'] == 'clearance').sum()}개"
+                     + (f", 같은 층 교차 {(clash_table['kind'] == 'crossing').sum()}개]" if clash_crossings else "]"))
+            st.download_button("CSV 다운로드 (전체 목록)", data=takeoff_csv(clash_table),
+                file_name="rebar_clash.csv", mime="text/csv")
+
+    # ✅ 피복 검토 (철근을 따라 찍은 점 → 콘크리트 바깥 면까지 거리, 설계별 결과 캐시)
+    covers = {}
+    with st.expander(":green[피복 검토]"):
+        col = st.columns(2)
+        with col[0]:
+            cover_on = st.checkbox(":orange[피복 검토 실행]", value=True, help="코핑 다각형, 기둥 원기둥, 기초 직육면체 바깥 면까지 최소 거리")
+        with col[1]:
+            cover_surface = st.checkbox(":orange[철근 표면 기준]", value=False, help="해제하면 철근 중심 기준 (입력 피복을 철근 중심 위치로 배치)")
+        cover_marks = st.checkbox(":orange[피복 부족 위치 3D 표시]", value=True, disabled=not cover_on)
+        if cover_on:
+            for design in designs:
+                covers[design['digest']] = cache.get_or_create(('cover', design['digest'], cover_surface),
+                    lambda: rebar_cover(design['model'], to_surface=cover_surface))
+            cover_table = pd.concat([covers[design['digest']].assign(piers=', '.join(design['piers']))
+                                     for design in designs], ignore_index=True)
+            st.dataframe(cover_summary(cover_table), hide_index=True, column_config={
+                'min_cover': st.column_config.NumberColumn(format="%.1f"),
+                'min_margin': st.column_config.NumberColumn(format="%.1f")})
+            st.write(f"###### :blue[피복 부족 {(~cover_table['ok']).sum()}개 / 철근 {len(cover_table)}개]")
+            st.download_button("CSV 다운로드 (철근별)", data=takeoff_csv(cover_table),
+                file_name="rebar_cover.csv", mime="text/csv")
+
+    # ✅ 정리된 입력 모델 저장 (다시 업로드하면 엑셀 읽기 생략)
+    st.download_button("입력 모델 저장 (.npz)", data=concrete_data.to_bytes(), file_name="coping_model.npz",
+        mime="application/octet-stream")
+
 volume_color, line_color = 'gray', 'blue'
-def common_plot(num):
-    if num == 100:        
-        plotter.add_mesh(volumes.combine(), color=volume_color, opacity=volume_opacity)
-        plotter.add_mesh(lines.combine(), color=line_color, opacity=volume_opacity, line_width=volume_line_width)
-        # plotter.enable_parallel_projection()
-        # plotter.export_html(f"visualization_{num}.html")
-    else:
-        plotter.add_mesh(volumes[num], color=volume_color, opacity=volume_opacity, label='coping')
-        plotter.add_mesh(lines[num], color=line_color, opacity=volume_opacity, line_width=volume_line_width)
-
-    add_arrow_axes(plotter)
+def common_plot(num, mirror=False):
+    with span('add_mesh volume'):
+        for design in designs:
+            volumes, lines = design['volumes'], design['lines']
+            matrices = mirror_matrices(design['matrices']) if mirror else design['matrices']
+            if num == 100:        
+                volume, line = cache.get_or_create(('volume_combined', design['digest']), lambda: (volumes.combine(), lines.combine()))
+                # plotter.enable_parallel_projection()
+                # plotter.export_html(f"visualization_{num}.html")
+            else:
+                volume, line = volumes[num], lines[num]
+            scene.show(f"{design['digest']}/volume/{num}", volume, matrices, color=volume_color, opacity=volume_opacity, label='coping')
+            scene.show(f"{design['digest']}/lines/{num}", line, matrices, color=line_color, opacity=volume_opacity, line_width=volume_line_width)
+
+    scene.end()   # 이번 뷰에 없는 actor 떼어내기
+    add_arrow_axes(plotter, scene=scene)
     set_camera_view(plotter, camera_projection, camera_position)
     plotter.legend_visibility = True
-    stpyvista(plotter)    
-
-
-with tab1:  # 전체 뷰
-    for (r_type, dia) in rebar:
-        # ✅ 선택된 타입과 직경에 맞게 필터링
-        if ((rebar_type == "All" or r_type == rebar_type) and
-            (rebar_dia == "All" or int(dia) == int(rebar_dia))):
-
-            mesh = rebar[(r_type, dia)]
-            color = color_map.get(r_type, 'green')
-            plotter.add_mesh(
-                mesh,
-                color=color,
-                line_width=rebar_line_width,
-                opacity=rebar_opacity,
-            )
-    if model_symmetry:
-        volumes_mesh = volumes.combine()
-        mirrored_mesh = volumes_mesh.reflect((1, 0, 0))  # X축 기준 반사
-        lines_mesh = lines.combine()
-        mirrored_lines = lines_mesh.reflect((1, 0, 0))  # X축 기준 반사
-
-        plotter.add_mesh(mirrored_mesh, color=volume_color, opacity=volume_opacity)
-        plotter.add_mesh(mirrored_lines, color=line_color, opacity=volume_opacity, line_width=volume_line_width)
-    common_plot(100)
-
-
-with tab2:  # 코핑 뷰
-    plotter.clear()
-
-    for (r_type, dia) in rebar:
-        if ('coping' in r_type) and \
-            (rebar_type == "All" or r_type == rebar_type) and \
-            (rebar_dia == "All" or int(dia) == int(rebar_dia)):
-
-            mesh = rebar[(r_type, dia)]
-            color = color_map.get(r_type, 'green')
-            plotter.add_mesh(
-                mesh,
-                color=color,
-                line_width=rebar_line_width,
-                opacity=rebar_opacity,
-            )
-    common_plot(0)
-
-with tab3:  # 기둥 뷰
-    plotter.clear()
-
-    for (r_type, dia) in rebar:
-        if ('column' in r_type) and \
-            (rebar_type == "All" or r_type == rebar_type) and \
-            (rebar_dia == "All" or int(dia) == int(rebar_dia)):
-
-            mesh = rebar[(r_type, dia)]
-            color = color_map.get(r_type, 'green')
-            plotter.add_mesh(
-                mesh,
-                color=color,
-                line_width=rebar_line_width,
-                opacity=rebar_opacity,
-            )
-    common_plot(1)
-
-with tab4:  # 기초 뷰
-    plotter.clear()
-
-    for (r_type, dia) in rebar:
-        if ('footing' in r_type) and \
-            (rebar_type == "All" or r_type == rebar_type) and \
-            (rebar_dia == "All" or int(dia) == int(rebar_dia)):
-
-            mesh = rebar[(r_type, dia)]
-            color = color_map.get(r_type, 'green')
-            plotter.add_mesh(
-                mesh,
-                color=color,
-                line_width=rebar_line_width,
-                opacity=rebar_opacity,
-            )
-    common_plot(2)
+    from stpyvista import stpyvista   # 웹 뷰어만 사용하면 import 하지 않음 (panel / bokeh)
+    with span('stpyvista', n_actors=len(plotter.actors)):
+        stpyvista(plotter)    
+
+
+# ✅ 뷰별 철근 부위 (None이면 전체)
+views = {"🏗️ 전체 뷰": None, "🧱 코핑 뷰": 'coping', "🏛️ 기둥 뷰": 'column', "⬛ 기초 뷰": 'footing'}
+view_volume = {None: 100, 'coping': 0, 'column': 1, 'footing': 2}
+
+def render_view(part):
+    scene.begin()
+    # 전체 모델 (대칭) : 반사 행렬을 가진 actor 를 추가 (메시 복사 없음, 필터 적용된 철근만)
+    mirror = part is None and model_symmetry
+
+    with span('add_mesh rebar', view=str(part)) as info:
+        for design in designs:
+            matrices = mirror_matrices(design['matrices']) if mirror else design['matrices']
+            if rebar_merged:   # 선택된 그룹의 셀 구간만 잘라낸 PolyData 1개 (색은 셀 배열 color)
+                selected = select_keys(design['merged'], part, rebar_type, rebar_dia)
+                subset = cache.get_or_create(('rebar_subset', design['digest'], rebar_scale, triangle_budget, spiral_tie, tuple(selected)),
+                                             lambda: rebar_subset(design['merged'], selected))
+                if subset.n_cells:
+                    scene.show(f"{design['digest']}/rebar", subset, matrices, scalars='color', rgb=True,
+                               line_width=rebar_line_width, opacity=rebar_opacity)
+            for (r_type, dia), mesh in ({} if rebar_merged else design['rebar']).items():
+                # ✅ 선택된 부위, 타입과 직경에 맞게 필터링
+                if (part is None or part in r_type) and \
+                    (rebar_type == "All" or r_type == rebar_type) and \
+                    (rebar_dia == "All" or int(dia) == int(rebar_dia)):
+
+                    color = color_map.get(r_type, 'green')
+                    scene.show(
+                        f"{design['digest']}/rebar/{r_type}/{dia}",
+                        mesh,
+                        matrices,
+                        color=color,
+                        line_width=rebar_line_width,
+                        opacity=rebar_opacity,
+                    )
+            # 간섭 위치 (점) : 선택된 부위, 타입의 철근이 포함된 쌍만
+            clash_table = clashes.get(design['digest'])
+            if clash_marks and clash_table is not None:
+                show = clash_table[clash_table['type_a'].str.contains(part or '') | clash_table['type_b'].str.contains(part or '')]
+                if rebar_type != "All":
+                    show = show[(show['type_a'] == rebar_type) | (show['type_b'] == rebar_type)]
+                if len(show):
+                    scene.show(f"{design['digest']}/clash", pv.PolyData(show[['x', 'y', 'z']].to_numpy(float)), matrices,
+                        color='red', point_size=8, render_points_as_spheres=True)
+            # 피복 부족 위치 (철근마다 피복이 가장 작은 점)
+            cover_table = covers.get(design['digest'])
+            if cover_marks and cover_table is not None:
+                show = cover_table[~cover_table['ok'] & cover_table['type'].str.contains(part or '')]
+                if rebar_type != "All":
+                    show = show[show['type'] == rebar_type]
+                if len(show):
+                    scene.show(f"{design['digest']}/cover", pv.PolyData(show[['x', 'y', 'z']].to_numpy(float)), matrices,
+                        color='orange', point_size=8, render_points_as_spheres=True)
+        info['n_actors'] = scene.n_actors()
+    common_plot(view_volume[part], mirror=mirror)
+
+
+with view_area:
+    if web_viewer:  # GLB 1개 → 브라우저에서 필터 / 카메라 변경 (서버 plotter 사용 안 함)
+        marks_key = ((clearance, clash_crossings) if clash_on and clash_marks else None, cover_surface if cover_on and cover_marks else None)
+        viewer_key = ('viewer', tuple(design['digest'] for design in designs), file_hash(uploaded_file) if multi_pier else None,
+                      rebar_scale, rebar_instanced, triangle_budget, spiral_tie, marks_key)
+
+        def create_viewer_glb():
+            marks = {}
+            for design in designs:
+                marks[design['digest']] = table_marks(clashes.get(design['digest']) if marks_key[0] is not None else None,
+                                                      'mark_clash', 'red', ('type_a', 'type_b'))
+                cover_table = covers.get(design['digest']) if marks_key[1] is not None else None
+                marks[design['digest']] += table_marks(None if cover_table is None else cover_table[~cover_table['ok']],
+                                                       'mark_cover', 'orange', ('type',))
+            return viewer_glb(designs, marks)
+
+        # HTML 은 GLB 만 담으므로 모델이 같으면 내용이 같음 → Streamlit 이 다시 보내지 않고 iframe 도 다시 불러오지 않음
+        # (필터 / 카메라 / 투명도는 뷰어 도구 막대에서 변경, 사이드바 값은 사용하지 않음)
+        html = cache.get_or_create(viewer_key, lambda: viewer_html(create_viewer_glb()))
+        with span('viewer html', html_mb=round(len(html) / 1024**2, 2)):
+            components.html(html, height=1100)
+    elif lazy_view:  # 선택한 뷰 1개만 생성 & 전송 (나머지는 선택할 때 생성)
+        view = st.radio("뷰 선택", list(views), horizontal=True, label_visibility="collapsed")
+        render_view(views[view])
+    else:  # 탭 4개 모두 생성
+        for tab, part in zip(st.tabs(list(views)), views.values()):
+            with tab:
+                render_view(part)
 
 
 
@@ -237,6 +391,24 @@ end_time = time.time()
 execution_time = end_time - start_time
 # st.sidebar.write('---')
 st.sidebar.write(f"실행 시간: {execution_time:.4f} 초")
+st.sidebar.caption(f"캐시: {len(cache.entries)}개, {cache.total_bytes / 1024**2:.1f} MB (hit {cache.hits} / miss {cache.misses})")
+if cache.disk is not None:
+    st.sidebar.caption(f"디스크 캐시 ({cache.disk.folder}): {len(cache.disk.files)}개, {cache.disk.total_bytes / 1024**2:.1f} MB "
+                       f"/ 최대 {cache.disk.max_bytes / 1024**2:.0f} MB (hit {cache.disk_hits})")
+if multi_pier:
+    st.sidebar.caption(f"교각 {len(piers)}개 → 설계 {len(designs)}종 (형상은 설계별 1벌, 교각은 배치 행렬)")
+if 0 < len(changed_sections) < len(concrete_data.keys()):   # 처음 실행(전체 변경)은 표시하지 않음
+    st.sidebar.caption(f"변경된 입력: {', '.join(changed_sections)} → 다시 생성: {', '.join(affected_groups(changed_sections)) or '없음'}")
+
+# ✅ 단계별 실행 시간 (캐시에서 가져온 단계는 기록되지 않음)
+profiler = stop_profile()
+if profiler is not None:
+    with st.sidebar.expander(":green[단계별 실행 시간 (debug)]", expanded=True):
+        st.dataframe(profiler.table(), hide_index=True, column_config={
+            'ms': st.column_config.NumberColumn(format="%.1f"),
+            'rss_MB': st.column_config.NumberColumn(format="%.1f")})
+        st.download_button("Chrome trace 다운로드 (.json)", data=profiler.chrome_trace(), file_name="coping_trace.json",
+            mime="application/json", help="chrome://tracing 또는 ui.perfetto.dev 에서 열기")
 
 
 
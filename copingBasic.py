@@ -1,6 +1,13 @@
 import numpy as np
 import pyvista as pv
 import streamlit as st
+from copingFcn import RebarInstances
+from copingProfile import profiled
+
+# 철근 종류별 표시 색상
+color_map = {'coping_outer': 'red', 'coping_x': 'magenta', 'coping_z': 'green', 'coping_y': 'blue',
+    'column_tie': 'purple', 'column_rebar': 'cyan', 'column_cross': 'red',
+    'footing_top': 'green', 'footing_bottom': 'orange', 'footing_ver': 'purple'}
 
 def get_all_bounds(plotter):
     x_min, x_max = float('inf'), float('-inf')
@@ -10,7 +17,7 @@ def get_all_bounds(plotter):
     for actor in plotter.actors.values():
         mesh = actor.GetMapper().GetInput()
         if mesh:
-            bounds = mesh.GetBounds()   # bounds = [x_min, x_max, y_min, y_max, z_min, z_max]            
+            bounds = actor.GetBounds()   # bounds = [x_min, x_max, y_min, y_max, z_min, z_max] (actor 이동 포함)
             x_min = min(x_min, bounds[0])
             x_max = max(x_max, bounds[1])
             y_min = min(y_min, bounds[2])
@@ -24,26 +31,63 @@ def get_all_bounds(plotter):
         'z': (z_min, z_max)
     }
 
-def add_arrow_axes(plotter, opacity=0.4, scale=2000):
+ARROWS = {}   # scale → (x, y, z 화살표 메시) : 한 번만 생성
+
+def arrow_meshes(scale):
+    if scale not in ARROWS:
+        ARROWS[scale] = tuple(pv.Arrow(direction=direction, scale=scale) for direction in np.eye(3))
+    return ARROWS[scale]
+
+def add_arrow_axes(plotter, opacity=0.4, scale=2000, scene=None):
+    # scene (copingScene.Scene) 을 주면 화살표 actor 를 다시 만들지 않고 위치 / 투명도만 변경
     bounds = get_all_bounds(plotter)
     z0 = np.mean(bounds['z'])   # z0 = 0
-
-    plotter.add_box_axes()  # xyz 축 표시 (이것이 스트림릿 웹에 표시 안됨 ㅠㅠ)
-    x_arrow = pv.Arrow(direction=(1, 0, 0), scale=scale)
-    y_arrow = pv.Arrow(direction=(0, 1, 0), scale=scale)
-    z_arrow = pv.Arrow(direction=(0, 0, 1), scale=scale)
-
-    x_arrow_copy = x_arrow.copy(deep=True)  # deep copy 생성
-    x_arrow_copy.translate((0, 0, z0), inplace=True)  # 새로운 위치로 이동
-    y_arrow_copy = y_arrow.copy(deep=True)
-    y_arrow_copy.translate((0, 0, z0), inplace=True)
-    z_arrow_copy = z_arrow.copy(deep=True)
-    z_arrow_copy.translate((0, 0, z0), inplace=True)
-    plotter.add_mesh(x_arrow_copy, color="red", opacity=opacity)
-    plotter.add_mesh(y_arrow_copy, color="green", opacity=opacity)
-    plotter.add_mesh(z_arrow_copy, color="blue", opacity=opacity)
+    if not plotter.renderer.axes_enabled:
+        plotter.add_box_axes()  # xyz 축 표시 (이것이 스트림릿 웹에 표시 안됨 ㅠㅠ)
+
+    matrix = np.eye(4)
+    matrix[2, 3] = z0   # 화살표 메시는 그대로 두고 actor 변환으로 이동
+    for name, arrow, color in zip('xyz', arrow_meshes(scale), ("red", "green", "blue")):
+        if scene is None:
+            actor = plotter.add_mesh(arrow, color=color, opacity=opacity)
+            actor.user_matrix = matrix
+        else:
+            scene.show(f'arrow_{name}', arrow, matrix[None], color=color, opacity=opacity)
     return plotter
 
+def add_rebar_mesh(plotter, mesh, **kwargs):
+    # 일반 PolyData 또는 인스턴싱 철근(RebarInstances) 모두 plotter에 추가
+    if isinstance(mesh, RebarInstances):
+        return mesh.add_to_plotter(plotter, **kwargs)
+    return plotter.add_mesh(mesh, **kwargs)
+
+MIRROR_X = np.diag([-1., 1., 1., 1.])   # x = 0 평면 대칭
+
+def mirror_matrices(matrices=None):
+    # 대칭 복사본까지 포함한 배치 행렬 목록 (원래 위치 + x = 0 평면 반사)
+    matrices = np.eye(4)[None] if matrices is None else np.asarray(matrices)
+    return np.concatenate([matrices, matrices @ MIRROR_X])
+
+def place_mesh(plotter, mesh, matrices=None, **kwargs):
+    # mesh 를 matrices (4×4 변환 행렬 목록) 위치마다 표시 : mapper 를 공유하는 actor 복사 (형상 데이터는 1벌)
+    # matrices 가 None 이면 add_rebar_mesh 와 같음
+    actors = add_rebar_mesh(plotter, mesh, **kwargs)
+    if matrices is None:
+        return actors
+    actors = actors if isinstance(actors, list) else [actors]
+    placed = []
+    for k, matrix in enumerate(matrices):
+        for actor in actors:
+            if k == 0:
+                instance = actor
+            else:
+                instance = pv.Actor(mapper=actor.mapper, prop=actor.prop)
+                instance.position = actor.position   # 인스턴싱 철근의 복사 위치 → 교각 변환은 그 다음에 적용
+                plotter.add_actor(instance, reset_camera=False)
+            instance.user_matrix = matrix
+            placed.append(instance)
+    return placed
+
 def set_camera_view(plotter, camera_projection, camera_position):
     if camera_projection == "orthographic":
         plotter.enable_parallel_projection()
@@ -77,6 +121,7 @@ def set_camera_view(plotter, camera_projection, camera_position):
     return plotter
 
 
+@profiled('create_volume')
 def create_volume(concrete_data):
     polyline_points = concrete_data['coping']['xyz'].astype(np.float32)
     outer_points = concrete_data['coping']['xyz']
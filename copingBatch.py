@@ -0,0 +1,126 @@
+"""
+coping_input.xlsx 형식의 엑셀 파일 여러 개 → 볼륨 / 철근 메시 파일 일괄 변환 (화면, Xvfb 불필요)
+
+  python copingBatch.py inputs/ -o out                       # 폴더 안의 모든 xlsx
+  python copingBatch.py "piers/*.xlsx" -o out -f vtp glb -j 8  # glob, 형식 여러 개, 프로세스 8개
+
+출력 : out/<파일명>/volume_*.vtp, rebar_<type>_<dia>.vtp (stl), <파일명>.glb + out/report.json, report.csv
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+FORMATS = ('vtp', 'stl', 'glb')
+
+
+def find_workbooks(inputs):
+    """ 폴더 / glob / 파일 경로 목록 → 엑셀 파일 목록 (엑셀 임시파일 ~$ 제외) """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths += glob.glob(os.path.join(item, '**', '*.xlsx'), recursive=True)
+        else:
+            paths += glob.glob(item, recursive=True) or [item]
+    paths = [p for p in paths if not os.path.basename(p).startswith('~$')]
+    return sorted(set(paths))
+
+
+def convert_workbook(path, out_dir, formats=('vtp',), rebar_scale=1.0):
+    """ 엑셀 1개 변환 (프로세스 풀에서 실행) → 파일별 시간 / 오류 보고 dict """
+    warnings.filterwarnings("ignore")
+    from copingData import get_coping_data
+    from copingBasic import create_volume, color_map
+    from copingRebar import coping_rebar
+    from copingExport import write_glb
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    report = {'file': path, 'status': 'ok', 'error': '', 'n_groups': 0, 'n_points': 0, 'n_cells': 0,
+              't_parse': 0., 't_volume': 0., 't_rebar': 0., 't_write': 0., 't_total': 0.}
+    t_start = time.perf_counter()
+    try:
+        t0 = time.perf_counter()
+        concrete_data = get_coping_data(path)
+        t1 = time.perf_counter()
+        volumes, lines = create_volume(concrete_data)
+        t2 = time.perf_counter()
+        rebar = coping_rebar(rebar_scale, concrete_data)
+        t3 = time.perf_counter()
+
+        meshes = [(f'volume_{key.split()[0].lower()}', volumes[key], 'gray', 0.3) for key in volumes.keys()]
+        meshes += [(f'rebar_{r_type}_{int(dia)}', mesh, color_map.get(r_type, 'green'), 1.0)
+                   for (r_type, dia), mesh in rebar.items() if mesh.n_points > 0]
+
+        target = os.path.join(out_dir, name)
+        os.makedirs(target, exist_ok=True)
+        for fmt in formats:
+            if fmt == 'glb':
+                write_glb(os.path.join(target, f'{name}.glb'), meshes)
+                continue
+            for mesh_name, mesh, _, _ in meshes:
+                if fmt == 'stl':
+                    if mesh.GetNumberOfPolys() + mesh.GetNumberOfStrips() == 0:   # 선(rebar_scale=0)은 STL로 저장 불가
+                        continue
+                    mesh = mesh.triangulate()
+                mesh.save(os.path.join(target, f'{mesh_name}.{fmt}'), binary=True)
+        t4 = time.perf_counter()
+
+        report.update(n_groups=len(rebar),
+                      n_points=sum(mesh.n_points for _, mesh, _, _ in meshes),
+                      n_cells=sum(mesh.n_cells for _, mesh, _, _ in meshes),
+                      t_parse=t1 - t0, t_volume=t2 - t1, t_rebar=t3 - t2, t_write=t4 - t3)
+    except Exception as e:
+        report.update(status='error', error=f'{type(e).__name__}: {e}', traceback=traceback.format_exc())
+    report['t_total'] = time.perf_counter() - t_start
+    return report
+
+
+def write_report(out_dir, reports):
+    with open(os.path.join(out_dir, 'report.json'), 'w', encoding='utf-8') as f:
+        json.dump(reports, f, ensure_ascii=False, indent=2)
+    fields = ['file', 'status', 'n_groups', 'n_points', 'n_cells', 't_parse', 't_volume', 't_rebar', 't_write', 't_total', 'error']
+    with open(os.path.join(out_dir, 'report.csv'), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(reports)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='coping_input 엑셀 → 메시 파일 일괄 변환')
+    parser.add_argument('inputs', nargs='+', help='엑셀 파일, 폴더 또는 glob 패턴')
+    parser.add_argument('-o', '--output', default='output', help='출력 폴더 (기본: output)')
+    parser.add_argument('-f', '--format', nargs='+', choices=FORMATS, default=['vtp'], help='출력 형식 (여러 개 가능)')
+    parser.add_argument('-s', '--rebar-scale', type=float, default=1.0, help='0이면 선, 1이면 실제 직경')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='프로세스 수 (기본: CPU 코어 수)')
+    args = parser.parse_args(argv)
+
+    paths = find_workbooks(args.inputs)
+    if not paths:
+        parser.error('입력 엑셀 파일이 없습니다.')
+    os.makedirs(args.output, exist_ok=True)
+
+    t0 = time.perf_counter()
+    reports = []
+    jobs = max(1, min(args.jobs or 1, len(paths)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(convert_workbook, p, args.output, tuple(args.format), args.rebar_scale) for p in paths]
+        for future in as_completed(futures):
+            report = future.result()
+            reports.append(report)
+            print(f"[{report['status']:>5}] {report['t_total']:7.3f} s  {report['file']}  {report['error']}")
+    reports.sort(key=lambda r: r['file'])
+    write_report(args.output, reports)
+
+    n_error = sum(r['status'] != 'ok' for r in reports)
+    print(f'{len(paths)}개 파일, 오류 {n_error}개, 전체 {time.perf_counter() - t0:.2f} s (프로세스 {jobs}개) → {args.output}')
+    return 1 if n_error else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+성능 측정 (회귀 확인용) : 합성 입력 파일 1× / 10× / 100× 철근 밀도 → 단계별 시간 / 최대 메모리 JSON
+
+  python copingBench.py                                  # 밀도 1 10 100, 결과 bench/bench_<커밋>.json
+  python copingBench.py -d 1 10 -r 5 -o bench/base.json  # 밀도, 반복 횟수, 출력 파일 지정
+  python copingBench.py -s coping_rebar_1 plot           # 일부 단계만
+  python copingBench.py -s coping_rebar_1 coping_rebar_thread coping_rebar_process   # 철근 그룹 동시 생성 비교
+  python copingBench.py -d 1 -r 1 -s coping_rebar_lod_min coping_rebar_spiral_lod_min   # 사이드바 최소 삼각형 예산 확인
+  python copingBench.py --compare bench/base.json bench/new.json   # 두 결과 비교 (시간 비율)
+
+밀도 D : 철근 표의 각 열 개수 × √D (간격은 같은 길이가 되도록 줄임)
+         → 격자로 복사되는 코핑 / 기초 철근의 전체 개수가 약 D배
+측정 단위마다 새 프로세스에서 실행 (최대 RSS가 앞 단계의 영향을 받지 않도록)
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+DENSITIES = (1, 10, 100)
+STAGES = ('get_coping_data', 'create_volume', 'coping_rebar_0', 'coping_rebar_1', 'coping_rebar_thread', 'coping_rebar_process',
+          'coping_rebar_lod_min', 'coping_rebar_spiral_lod_min', 'find2_point', 'find2_points', 'plot')
+BAR_TABLES = ('rebar_x', 'rebar_y', 'rebar_z', 'column_tie', 'footing_top', 'footing_bottom')
+LOD_MIN_BUDGET = 10 * 1000   # coping.py 사이드바 삼각형 예산 최솟값 (천 개 단위 10)
+
+
+def write_synthetic_input(path, density, template="coping_input.xlsx"):
+    """ 기본 입력 파일의 철근 표 개수를 √density 배로 늘린 엑셀 파일 작성 (전체 길이 = 개수 × 간격 유지) """
+    from openpyxl import load_workbook
+
+    factor = density ** 0.5
+    wb = load_workbook(template, data_only=True)   # 수식 대신 계산된 값으로 저장
+    ws = wb.worksheets[0]
+    keywords = {}
+    for row in ws.iter_rows():
+        for cell in row:
+            if isinstance(cell.value, str):
+                keywords.setdefault(cell.value.strip().lower(), (cell.row, cell.column))
+
+    def scale(count_cell, spacing_cell=None):
+        count = count_cell.value
+        if not isinstance(count, (int, float)) or count <= 0:
+            return False
+        new_count = max(1, round(count * factor))
+        count_cell.value = new_count
+        if spacing_cell is not None and isinstance(spacing_cell.value, (int, float)):
+            spacing_cell.value = spacing_cell.value * count / new_count
+        return True
+
+    for keyword in BAR_TABLES:
+        row, col = keywords[keyword]
+        for c in range(col + 1, col + 8):
+            if not scale(ws.cell(row + 1, c), ws.cell(row + 2, c)):
+                break
+    row, col = keywords['column_rebar']
+    scale(ws.cell(row + 2, col + 1))   # 기둥 주철근 개수 (num)
+    wb.save(path)
+    return path
+
+
+def mesh_counts(meshes):
+    n_points = n_cells = 0
+    for mesh in meshes:
+        n_points += mesh.n_points
+        n_cells += mesh.n_cells
+    return {'n_points': n_points, 'n_cells': n_cells}
+
+
+def prepare(stage, path):
+    """ 측정하지 않는 준비 단계 → (측정할 함수, 결과 크기를 세는 함수) """
+    from copingData import get_coping_data
+    from copingBasic import create_volume, add_rebar_mesh, color_map
+    from copingRebar import coping_rebar
+    from copingFcn import find2_point, find2_points
+
+    if stage == 'get_coping_data':
+        return lambda: get_coping_data(path), lambda model: {}
+
+    model = get_coping_data(path)
+    if stage == 'create_volume':
+        return lambda: create_volume(model), lambda result: mesh_counts([*result[0], *result[1]])
+    if stage in ('coping_rebar_0', 'coping_rebar_1'):
+        rebar_scale = float(stage[-1])
+        return lambda: coping_rebar(rebar_scale, model), lambda rebar: {'n_groups': len(rebar), **mesh_counts(rebar.values())}
+    if stage in ('coping_rebar_thread', 'coping_rebar_process'):
+        # rebar_scale 1, 작업자 수 = CPU 수 (실행기 시작은 준비 단계에서 한 번 실행해 제외)
+        executor = stage.rsplit('_', 1)[1]
+        coping_rebar(1.0, model, executor=executor)
+        return lambda: coping_rebar(1.0, model, executor=executor), \
+            lambda rebar: {'n_groups': len(rebar), 'workers': os.cpu_count(), **mesh_counts(rebar.values())}
+    if stage in ('coping_rebar_lod_min', 'coping_rebar_spiral_lod_min'):
+        # 자동 LOD 최소 예산 : 대부분의 그룹이 선으로 바뀌는 경우 (나선 띠철근 포함)
+        spiral = 'spiral' in stage
+        return lambda: coping_rebar(1.0, model, triangle_budget=LOD_MIN_BUDGET, spiral=spiral), \
+            lambda rebar: {'n_groups': len(rebar), **mesh_counts(rebar.values())}
+
+    if stage in ('find2_point', 'find2_points'):
+        # coping_z 철근 직선 (rebar_layout 3단계와 같은 위치)
+        import numpy as np
+        from copingRebar import cumulative_distance
+        distance = cumulative_distance(model['rebar_x'].valid_rows('count', 'spacing', start=1))
+        x0 = -model['length']['x'] + model['coping_cover']['thickness']
+        line_p0 = np.column_stack([x0 + distance, np.zeros_like(distance), np.full_like(distance, -99999)])
+        line_dir = [0, 0, 99999]
+        if stage == 'find2_point':
+            run = lambda: [find2_point(model, p0, line_dir) for p0 in line_p0]
+        else:
+            run = lambda: find2_points(model, line_p0, line_dir)
+        return run, lambda result: {'n_lines': len(line_p0)}
+
+    if stage == 'plot':
+        # coping.py 의 전체 뷰 1개와 같은 구성 (볼륨 + 모든 철근) → plotter에 추가
+        import pyvista as pv
+        volumes, lines = create_volume(model)
+        rebar = coping_rebar(1.0, model)
+        render = os.environ.get('COPING_BENCH_RENDER') == '1'
+
+        def run():
+            plotter = pv.Plotter(off_screen=True, window_size=[1600, 1200])
+            for (r_type, dia), mesh in rebar.items():
+                add_rebar_mesh(plotter, mesh, color=color_map.get(r_type, 'green'), opacity=1.0)
+            plotter.add_mesh(volumes.combine(), color='gray', opacity=0.3)
+            plotter.add_mesh(lines.combine(), color='blue', opacity=0.3, line_width=2)
+            if render:   # 화면(또는 Xvfb)이 있을 때만 : 렌더링 + stpyvista 와 같은 HTML 직렬화
+                plotter.screenshot(return_img=True)
+                plotter.export_html(os.path.join(tempfile.gettempdir(), 'coping_bench.html'))
+            n_actors = len(plotter.actors)
+            plotter.close()
+            return n_actors
+        return run, lambda n_actors: {'n_actors': n_actors, **mesh_counts(rebar.values())}
+
+    raise ValueError(f'알 수 없는 단계: {stage}')
+
+
+def max_rss_mb():
+    """ 프로세스 최대 RSS (MB), resource 모듈이 없는 Windows 는 None """
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024**2 if sys.platform == 'darwin' else rss / 1024   # macOS : bytes, Linux : KiB
+
+
+def mb_text(value):
+    return f'{value:8.1f}' if value is not None else f"{'-':>8}"
+
+
+def run_case(stage, path, repeat):
+    """ (단계, 입력 파일) 1개 측정 (새 프로세스에서 실행) """
+    warnings.filterwarnings("ignore")
+    rss_before = max_rss_mb()
+    run, describe = prepare(stage, path)
+
+    times = []
+    tracemalloc.start()
+    for i in range(repeat):
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - t0)
+        if i == 0:
+            peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_after = max_rss_mb()
+    if stage == 'coping_rebar_process':   # 철근 작업 프로세스를 종료해야 측정 프로세스가 끝남
+        from copingRebar import shutdown_rebar_pools
+        shutdown_rebar_pools()
+
+    return {'stage': stage, **describe(result),
+            'time_min': min(times), 'time_median': statistics.median(times), 'times': times,
+            'peak_python_mb': peak / 1024**2,                    # NumPy / Python 할당 (tracemalloc)
+            'max_rss_mb': rss_after,                             # 프로세스 최대 RSS (VTK 포함, Windows : None)
+            'rss_growth_mb': None if rss_after is None else rss_after - rss_before}   # 준비 단계 이후 증가량
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def compare(old_path, new_path):
+    """ 두 결과 파일 비교 : (밀도, 단계)별 최소 시간 / 최대 RSS 비율 (new / old) """
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+    old_results = {(r['density'], r['stage']): r for r in old['results']}
+    print(f"{'density':>7} {'stage':<16} {'old [s]':>9} {'new [s]':>9} {'ratio':>6} {'old MB':>8} {'new MB':>8}"
+          f"   ({old['commit']} → {new['commit']})")
+    for r in new['results']:
+        o = old_results.get((r['density'], r['stage']))
+        if o is None or 'time_min' not in o or 'time_min' not in r:
+            continue
+        print(f"{r['density']:>7} {r['stage']:<16} {o['time_min']:9.4f} {r['time_min']:9.4f} "
+              f"{r['time_min'] / o['time_min']:6.2f} {mb_text(o.get('max_rss_mb'))} {mb_text(r.get('max_rss_mb'))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='coping 단계별 성능 측정 (합성 입력, 철근 밀도별)')
+    parser.add_argument('-d', '--density', nargs='+', type=int, default=list(DENSITIES), help='철근 밀도 배수 (기본: 1 10 100)')
+    parser.add_argument('-s', '--stage', nargs='+', choices=STAGES, default=list(STAGES), help='측정할 단계')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='단계별 반복 횟수 (최소 / 중앙값 기록)')
+    parser.add_argument('-o', '--output', help='결과 JSON 파일 (기본: bench/bench_<커밋>.json)')
+    parser.add_argument('--input-dir', help='합성 입력 파일 저장 폴더 (기본: 임시 폴더)')
+    parser.add_argument('--render', action='store_true', help='plot 단계에서 렌더링 / HTML 직렬화까지 측정 (화면 또는 Xvfb 필요)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='두 결과 JSON 비교만 출력')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    commit = git_commit()
+    output = args.output or os.path.join('bench', f'bench_{commit}.json')
+    input_dir = args.input_dir or tempfile.mkdtemp(prefix='coping_bench_')
+    os.makedirs(input_dir, exist_ok=True)
+    if args.render:
+        os.environ['COPING_BENCH_RENDER'] = '1'
+
+    results = []
+    for density in args.density:
+        path = write_synthetic_input(os.path.join(input_dir, f'coping_input_x{density}.xlsx'), density)
+        for stage in args.stage:
+            # 단계마다 새 프로세스 (max_tasks_per_child=1)
+            with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+                try:
+                    result = pool.submit(run_case, stage, path, args.repeat).result()
+                except Exception as e:   # 메모리 부족 등으로 프로세스가 종료된 경우도 기록
+                    result = {'stage': stage, 'error': f'{type(e).__name__}: {e}'}
+            result = {'density': density, **result}
+            results.append(result)
+            if 'error' in result:
+                print(f"x{density:<4} {stage:<16} 오류 : {result['error']}")
+            else:
+                print(f"x{density:<4} {stage:<16} {result['time_min']:9.4f} s  (중앙값 {result['time_median']:.4f})  "
+                      f"RSS {mb_text(result['max_rss_mb'])} MB  Python {result['peak_python_mb']:8.1f} MB")
+
+    report = {'commit': commit, 'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+              'platform': platform.platform(), 'cpu_count': os.cpu_count(), 'repeat': args.repeat,
+              'render': args.render, 'results': results}
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'→ {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pyvista as pv
+import streamlit as st
+from copingFcn import RebarInstances
+from copingData import get_coping_data
+from copingBasic import create_volume
+from copingRebar import coping_rebar
+from copingModel import Section
+from copingDiskCache import disk_cache_from_env
+
+CACHE_MAX_BYTES = 512 * 1024**2   # 서버 프로세스 전체 캐시 최대 크기
+CACHE_MAX_ENTRIES = 64
+
+
+def file_hash(uploaded_file=None):
+    """ 입력 파일 내용의 해시 (업로드 파일이 없으면 기본 coping_input.xlsx) """
+    if uploaded_file is None:
+        with open("coping_input.xlsx", "rb") as f:
+            content = f.read()
+    else:
+        content = uploaded_file.getvalue()
+    return hashlib.sha1(content).hexdigest()
+
+
+def data_hash(concrete_data):
+    """ concrete_data (CopingModel / dict / NumPy 배열 / 숫자 / 문자열) 내용의 해시 """
+    h = hashlib.sha1()
+    def update(value):
+        if isinstance(value, Section):
+            h.update(type(value).__name__.encode())
+            for key, v in value.items():
+                h.update(repr(key).encode())
+                update(v)
+        elif isinstance(value, dict):
+            for key in sorted(value, key=str):
+                h.update(repr(key).encode())
+                update(value[key])
+        elif isinstance(value, np.ndarray) and value.dtype != object:
+            h.update(f'{value.dtype}{value.shape}'.encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (np.ndarray, list, tuple)):
+            h.update(f'[{len(value)}'.encode())
+            for v in value:
+                update(v)
+        else:
+            h.update(repr(value).encode())
+    update(concrete_data)
+    return h.hexdigest()
+
+
+def estimate_size(value):
+    """ 캐시 항목의 대략적인 메모리 크기 (bytes) """
+    if isinstance(value, pv.MultiBlock):
+        return sum(estimate_size(block) for block in value if block is not None)
+    if isinstance(value, pv.DataSet):
+        return value.actual_memory_size * 1024   # KiB → bytes
+    if isinstance(value, RebarInstances):
+        return estimate_size(value.mesh) + value.offsets.nbytes
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(sys.getsizeof(v) for v in value.ravel())
+        return value.nbytes
+    if isinstance(value, Section):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class GeometryCache:
+    """ 크기 제한 LRU 캐시 (여러 세션이 공유하므로 lock 사용)
+    key 예: ('input', 파일 해시), ('volume', 데이터 해시), ('rebar', 데이터 해시, rebar_scale, ...)
+    disk (copingDiskCache.DiskCache) 를 주면 메모리에 없는 볼륨 / 철근 그룹은 디스크에서 읽고, 새로 만든 것은 디스크에도 저장  """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_entries=CACHE_MAX_ENTRIES, disk=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()   # key → (value, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.building = {}   # key → 생성 중인 항목의 lock (같은 항목을 여러 세션이 동시에 만들지 않도록)
+        self.disk = disk
+        self.disk_hits = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+        if self.disk is not None and self.disk.accepts(key):
+            missing = object()
+            value = self.disk.load(key, missing)
+            if value is not missing:
+                with self.lock:
+                    self.disk_hits += 1
+                return self.store(key, value)
+        with self.lock:
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """ 메모리에 저장 (+ 디스크 캐시 대상이면 디스크에도) """
+        self.store(key, value)
+        if self.disk is not None and self.disk.accepts(key):
+            self.disk.save(key, value)
+        return value
+
+    def store(self, key, value):
+        """ 메모리에만 저장 """
+        size = estimate_size(value)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            if size > self.max_bytes:   # 혼자서 한도를 넘는 항목은 저장하지 않음
+                return value
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            # 오래 사용하지 않은 항목부터 제거
+            while self.total_bytes > self.max_bytes or len(self.entries) > self.max_entries:
+                _, (_, old_size) = self.entries.popitem(last=False)
+                self.total_bytes -= old_size
+        return value
+
+    def get_or_create(self, key, create):
+        """ 없으면 create() 결과를 저장 : 다른 스레드가 같은 key 를 만드는 중이면 끝날 때까지 기다렸다가 그 결과 사용 """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        with self.lock:
+            building = self.building.setdefault(key, threading.Lock())
+        try:
+            with building:
+                with self.lock:
+                    entry = self.entries.get(key)
+                value = self.put(key, create()) if entry is None else entry[0]
+        finally:
+            with self.lock:
+                if self.building.get(key) is building:
+                    del self.building[key]
+        return value
+
+    def claim(self, key):
+        """ 여러 항목을 한 번에 만들 때 (coping_rebar 의 철근 그룹) get_or_create 대신 사용
+        메모리에 없고 아무도 만들고 있지 않으면 생성 중으로 표시하고 lock 반환 → 만든 뒤 put, release(key, lock)
+        None 이면 이미 있거나 다른 스레드가 만드는 중 → get_or_create 로 기다렸다가 그 결과 사용  """
+        with self.lock:
+            if key in self.entries or key in self.building:
+                return None
+            building = self.building[key] = threading.Lock()
+            building.acquire()
+        return building
+
+    def release(self, key, building):
+        """ claim 으로 표시한 생성 끝 (실패해도 호출 : 기다리던 스레드가 직접 만듦) """
+        with self.lock:
+            if self.building.get(key) is building:
+                del self.building[key]
+        building.release()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+def cached_coping_data(cache, uploaded_file=None):
+    """ 입력 파일 해시 → (concrete_data, 데이터 해시) """
+    def load():
+        concrete_data = get_coping_data(uploaded_file)
+        return concrete_data, data_hash(concrete_data)
+    return cache.get_or_create(('input', file_hash(uploaded_file)), load)
+
+
+def warm_up(cache, rebar_scale=1.):
+    """ 기본 입력 (coping_input.xlsx) 모델을 미리 생성 : 데이터 → 볼륨 → 철근 (앱 기본 설정과 같은 캐시 key) """
+    concrete_data, data_key = cached_coping_data(cache)
+    cache.get_or_create(('volume', data_key), lambda: create_volume(concrete_data))
+    coping_rebar(rebar_scale, concrete_data, cache=cache)
+
+
+@st.cache_resource
+def geometry_cache():
+    # 서버 프로세스당 1개 (모든 세션 공유), 디스크 캐시는 COPING_DISK_CACHE 폴더 (서버 재시작 / 다른 인스턴스와 공유)
+    return GeometryCache(disk=disk_cache_from_env())
+
+
+if __name__ == '__main__':
+    # 배포 전에 디스크 캐시 미리 채우기 : COPING_DISK_CACHE=<폴더> python copingCache.py
+    cache = GeometryCache(disk=disk_cache_from_env())
+    warm_up(cache)
+    print(f'디스크 캐시: {len(cache.disk.files)}개, {cache.disk.total_bytes / 1024**2:.1f} MB' if cache.disk else '디스크 캐시 사용 안 함 (COPING_DISK_CACHE 에 폴더 지정)')
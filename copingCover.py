@@ -0,0 +1,170 @@
+"""
+피복 검토 : 철근을 따라 점을 찍어 콘크리트 (코핑 + 기둥 + 기초) 바깥 면까지 최소 거리 계산
+
+  코핑 : xz 다각형을 y 방향 (0 ~ length.y) 으로 돌출
+  기둥 : 원기둥 (기초 상면 ~ 코핑 하면)
+  기초 : 직육면체
+  서로 맞닿은 면 (기둥이 붙는 코핑 하면 / 기초 상면의 원 부분, 기둥 위아래 끝면) 은 바깥 면이 아니므로 제외
+  코핑의 x = 0 변은 대칭면 (반쪽 모델) 이므로 제외
+
+요구 피복 : 가장 가까운 면의 입력값 (코핑 coping_cover.thickness, 기둥 column.cover,
+           기초 상면 cover_upper / 하면 cover_lower / 측면 cover_xy)
+"""
+import numpy as np
+import pandas as pd
+from copingClash import rebar_capsules
+from copingRebar import rebar_layout, column_center
+from copingProfile import profiled, span
+
+FACE_NAMES = ('coping', 'column', 'footing_top', 'footing_bottom', 'footing_side')
+
+
+def point_in_polygon(points, polygon):
+    """ 교차 횟수 (crossing number) : 점 (N, 2) 이 닫힌 다각형 (n, 2) 안에 있는지 → (N,) bool """
+    a, b = polygon[:-1], polygon[1:]
+    px, pz = points[:, :1], points[:, 1:]
+    crosses = (a[:, 1] > pz) != (b[:, 1] > pz)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = a[:, 0] + (pz - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    return (crosses & (px < x_cross)).sum(axis=1) % 2 == 1
+
+
+def edge_distance(points, a, b):
+    """ 점 (N, 2) 에서 선분 a-b (E, 2) 까지 거리 → (N, E) """
+    d = b - a
+    length2 = (d * d).sum(axis=1)
+    t = ((points[:, None, :] - a) * d).sum(axis=2) / np.where(length2 > 0, length2, 1)
+    t = np.clip(t, 0, 1)
+    return np.linalg.norm(points[:, None, :] - (a + t[..., None] * d), axis=2)
+
+
+def concrete_shape(concrete_data):
+    """ 피복 계산용 콘크리트 형상 (create_volume 과 같은 위치) """
+    length = concrete_data['length']
+    column = concrete_data['column']
+    footing = concrete_data['footing']
+    polygon = np.asarray(concrete_data['coping']['xz'], dtype=float)
+    if not np.allclose(polygon[0], polygon[-1]):
+        polygon = np.vstack([polygon, polygon[:1]])
+    xc, yc = column_center(concrete_data)
+    z_top, z_bottom = column['height'] / 2, -column['height'] / 2
+
+    # 기둥이 붙는 코핑 하면 : 기둥 상단 높이의 수평 변 중 기둥 중심을 지나는 변
+    a, b = polygon[:-1], polygon[1:]
+    hole_edge = np.isclose(a[:, 1], z_top) & np.isclose(b[:, 1], z_top) & \
+        (np.minimum(a[:, 0], b[:, 0]) <= xc) & (xc <= np.maximum(a[:, 0], b[:, 0]))
+    symmetry_edge = np.isclose(a[:, 0], 0) & np.isclose(b[:, 0], 0)
+    return {'polygon': polygon, 'hole_edge': hole_edge, 'symmetry_edge': symmetry_edge, 'length_y': length['y'],
+            'axis': (xc, yc), 'radius': column['diameter'] / 2, 'z_range': (z_bottom, z_top),
+            'box_lo': np.array([xc - footing['length_x']/2, yc - footing['length_y']/2, z_bottom - footing['height']]),
+            'box_hi': np.array([xc + footing['length_x']/2, yc + footing['length_y']/2, z_bottom]),
+            'required': np.array([concrete_data['coping_cover']['thickness'], column['cover'],
+                                  footing['cover_upper'], footing['cover_lower'], footing['cover_xy']])}
+
+
+def surface_distance(points, shape):
+    """ 점 (N, 3) → (바깥 면까지 거리 (콘크리트 밖이면 음수), 가장 가까운 면 번호 (FACE_NAMES)) """
+    x, y, z = points[:, 0], points[:, 1], points[:, 2]
+    polygon, length_y = shape['polygon'], shape['length_y']
+    xc, yc = shape['axis']
+    radius = shape['radius']
+    z_bottom, z_top = shape['z_range']
+    lo, hi = shape['box_lo'], shape['box_hi']
+
+    rh = np.hypot(x - xc, y - yc)             # 기둥 축까지 수평 거리
+    hole = np.maximum(radius - rh, 0)          # 기둥 단면 안쪽이면 맞닿은 면 가장자리까지 거리
+
+    # 코핑 : 옆면 (다각형 변 × y), 앞뒤 면 (y = 0, length_y)
+    xz = points[:, [0, 2]]
+    if shape['symmetry_edge'].any():   # 대칭면 반대쪽 점은 반사, 대칭면 위의 점은 안쪽으로
+        xz[:, 0] = np.minimum(-np.abs(xz[:, 0]), -1e-6)
+    d_edge = edge_distance(xz, polygon[:-1], polygon[1:])
+    dy_out = np.maximum(np.maximum(-y, y - length_y), 0)
+    walls = np.sqrt(d_edge**2 + dy_out[:, None]**2 + np.where(shape['hole_edge'], hole[:, None]**2, 0))
+    walls[:, shape['symmetry_edge']] = np.inf
+    in_polygon = point_in_polygon(xz, polygon)
+    out_polygon = np.where(in_polygon, 0, d_edge.min(axis=1))
+    caps = np.sqrt(np.column_stack([y, y - length_y])**2 + out_polygon[:, None]**2)
+
+    # 기둥 옆면
+    dz_out = np.maximum(np.maximum(z_bottom - z, z - z_top), 0)
+    column_side = np.sqrt((rh - radius)**2 + dz_out**2)
+
+    # 기초 6면 : 면까지 수직 거리 + 면 밖으로 벗어난 거리 (상면은 기둥 단면 제외)
+    box = []
+    for axis in range(3):
+        other = [k for k in range(3) if k != axis]
+        out = np.maximum(np.maximum(lo[other] - points[:, other], points[:, other] - hi[other]), 0)
+        in_plane = (out**2).sum(axis=1)
+        for bound in (lo, hi):
+            extra = hole**2 if axis == 2 and bound is hi else 0
+            box.append(np.sqrt((points[:, axis] - bound[axis])**2 + in_plane + extra))
+    # box 순서 : x-, x+, y-, y+, z- (하면), z+ (상면)
+
+    # 기둥 옆면은 마지막 : 코핑 하면 / 기초 상면 모서리와 거리가 같으면 코핑 / 기초 면 기준
+    distance = np.column_stack([walls, caps, *box, column_side])
+    face = np.array([0] * (walls.shape[1] + 2) + [4, 4, 4, 4, 3, 2, 1])
+    nearest = distance.argmin(axis=1)
+
+    inside = (in_polygon & (y >= 0) & (y <= length_y)) | \
+        ((rh <= radius) & (z >= z_bottom) & (z <= z_top)) | \
+        ((points >= lo) & (points <= hi)).all(axis=1)
+    d = distance[np.arange(len(points)), nearest]
+    return np.where(inside, d, -d), face[nearest]
+
+
+def sample_points(p0, p1, step):
+    """ 선분마다 step 이하 간격으로 점 찍기 (양 끝 포함) → (점 (M, 3), 선분 번호 (M,)) """
+    n_piece = np.maximum(1, np.ceil(np.linalg.norm(p1 - p0, axis=1) / step)).astype(np.int64)
+    segment = np.repeat(np.arange(len(p0)), n_piece + 1)
+    k = np.arange(len(segment)) - np.repeat(np.cumsum(n_piece + 1) - (n_piece + 1), n_piece + 1)
+    t = (k / n_piece[segment])[:, None]
+    return p0[segment] + (p1 - p0)[segment] * t, segment
+
+
+@profiled('rebar_cover')
+def rebar_cover(concrete_data, step=200., to_surface=False, tol=1., chunk=500_000):
+    """ 철근마다 최소 피복 검토 → DataFrame (철근 1개마다 1행, 피복이 가장 부족한 점 기준)
+    cover    : 콘크리트 바깥 면까지 거리 (밖이면 음수)
+               기본은 철근 중심 기준 (배치 함수들이 입력 피복을 철근 중심 위치로 사용), to_surface 이면 철근 표면 기준
+    required : 가장 가까운 면의 입력 피복,  ok : cover >= required - tol
+    띠철근 고리는 원 위의 점 (다각형 꼭짓점) 으로 검토  """
+    columns = ['bar', 'type', 'dia', 'cover', 'required', 'margin', 'face', 'ok', 'x', 'y', 'z']
+    caps = rebar_capsules(rebar_layout(concrete_data), tie_segments=64)
+    if not len(caps['p0']):
+        return pd.DataFrame(columns=columns)
+    shape = concrete_shape(concrete_data)
+
+    with span('sample points') as info:
+        points, segment = sample_points(caps['p0'], caps['p1'], step)
+        info['n_points'] = len(points)
+    with span('surface distance'):
+        distance, face = np.empty(len(points)), np.empty(len(points), dtype=int)
+        for k in range(0, len(points), chunk):   # 중간 배열 (점 × 면) 크기 제한
+            distance[k:k+chunk], face[k:k+chunk] = surface_distance(points[k:k+chunk], shape)
+
+    cover = distance - caps['radius'][segment] if to_surface else distance
+    required = shape['required'][face]
+    margin = cover - required
+
+    # 철근마다 margin 이 가장 작은 점
+    bar = caps['bar'][segment]
+    order = np.lexsort((margin, bar))
+    _, first = np.unique(bar[order], return_index=True)
+    worst = order[first]
+
+    group = caps['group'][segment[worst]]
+    types = np.array([r_type for r_type, _ in caps['keys']])
+    dias = np.array([int(dia) for _, dia in caps['keys']])
+    return pd.DataFrame({
+        'bar': bar[worst], 'type': types[group], 'dia': dias[group],
+        'cover': cover[worst], 'required': required[worst], 'margin': margin[worst],
+        'face': np.array(FACE_NAMES)[face[worst]], 'ok': margin[worst] >= -tol,
+        'x': points[worst, 0], 'y': points[worst, 1], 'z': points[worst, 2]}, columns=columns)
+
+
+def cover_summary(covers):
+    """ 철근 타입별 개수, 피복 부족 개수, 최소 피복 """
+    return covers.groupby('type', as_index=False).agg(
+        bars=('bar', 'size'), fail=('ok', lambda ok: int((~ok).sum())),
+        min_cover=('cover', 'min'), min_margin=('margin', 'min'))
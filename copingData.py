@@ -1,15 +1,87 @@
 import pandas as pd
 import numpy as np
 import streamlit as st
-from shapely.geometry import Polygon
+from copingModel import CopingModel
+from copingProfile import span, profiled
 
+def read_sheet(source):
+    """ 엑셀 첫 번째 시트 → 2차원 object 배열 (빈 칸은 NaN)
+    openpyxl read_only 모드로 행 단위 스트리밍 (숫자는 pandas.read_excel과 같이 정수면 int)  """
+    from openpyxl import load_workbook   # 엑셀을 읽을 때만 import (.npz / 캐시 사용 시 불필요)
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = list(wb.worksheets[0].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+    n_col = max((len(row) for row in rows), default=0)
+    cells = np.full((len(rows), n_col), np.nan, dtype=object)
+    for i, row in enumerate(rows):
+        for j, value in enumerate(row):
+            if value is None or value == '':
+                continue
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            cells[i, j] = value
+    return cells
+
+
+def keyword_index(cells):
+    """ 시트를 한 번만 훑어서 키워드(소문자, 공백 제거) → 첫 번째 (row, col) 위치 """
+    index = {}
+    for (row, col), value in np.ndenumerate(cells):
+        if isinstance(value, str):
+            index.setdefault(value.strip().lower(), (row, col))
+    return index
+
+
+def coping_points(xz, thickness):
+    """ 코핑 외곽 (x, z) 점 → {'xz', 'xz_inner', 'xyz', 'xyz_inner'} (피복 안쪽 라인, 3차원 좌표) """
+    from shapely.geometry import Polygon   # 내부 라인 계산할 때만 import
+    ### 코핑 콘크리트 내부 라인(점) 추출
+    outer = Polygon(xz)    
+    inner = outer.buffer(-thickness, join_style=2)  # 안쪽(음수) 오프셋 120mm 생성
+    
+    # Shapely 결과 → NumPy 변환 ===
+    inner_points = np.array(inner.exterior.coords)    
+    inner_points = inner_points[::-1]   # 기본 시계방향(buffer 기본)을 반시계방향으로 변환
+
+    # 3차원 좌표 생성  (# 1번 위치(y좌표)에 0 삽입)
+    xyz = np.insert(xz, 1, 0, axis=1)  
+    xyz_inner = np.insert(inner_points, 1, 0, axis=1)
+    # 내부 맨 우측 피복 두께 만큼 이동
+    xyz_inner[5][0] += thickness
+    xyz_inner[6][0] += thickness
+    return {'xz': xz, 'xz_inner': inner_points, 'xyz': xyz, 'xyz_inner': xyz_inner}
+
+
+def read_model(source):
+    """ 저장된 모델 파일(.npz) → CopingModel (없으면 None) """
+    name = source if isinstance(source, str) else getattr(source, 'name', '')
+    if not str(name).lower().endswith('.npz'):
+        return None
+    if isinstance(source, str):
+        return CopingModel.load(source)
+    return CopingModel.from_bytes(source.getvalue())
+
+
+@profiled('get_coping_data')
 def get_coping_data(uploaded_file=None):
+    """ 입력 엑셀 (또는 저장된 모델 .npz) → CopingModel """
     if uploaded_file is None:  # 업로드된 파일이 없으면 기본 파일 읽기        
-        df = pd.read_excel("coping_input.xlsx", sheet_name=0, header=None, engine="openpyxl")
-    else:  # 업로드된 파일이 있으면 그 파일 읽기
-        df = pd.read_excel(uploaded_file, sheet_name=0, header=None)
-    arr = df.fillna('').to_numpy().astype(str)  # ✅ Numpy 배열 변환 (성능 향상)    
-    # st.write(arr)
+        uploaded_file = "coping_input.xlsx"
+    model = read_model(uploaded_file)   # 저장된 모델은 openpyxl 없이 바로 읽기
+    if model is not None:
+        return model
+    with span('excel load') as info:
+        cells = read_sheet(uploaded_file)   # ✅ 스트리밍 읽기 → object 배열
+        info['n_cells'] = cells.size
+    with span('keyword index') as info:
+        index = keyword_index(cells)        # ✅ 키워드 위치 (시트 1회 탐색)
+        info['n_keywords'] = len(index)
+
+    # 표 범위를 벗어나도 NaN이 되도록 여유 공간 추가
+    cells = np.pad(cells, ((0, 10), (0, 10)), constant_values=np.nan)
 
     # ✅ 키워드별 데이터 처리 규칙 (공통 처리)
     keyword_config = {
@@ -35,50 +107,37 @@ def get_coping_data(uploaded_file=None):
 
     concrete_data = {}    # ✅ 공통 데이터 추출 함수
     def extract_data(keyword, keys):
-        mask = np.char.lower(np.char.strip(arr)) == keyword.lower()
-        
-        if mask.any():
-            row_idx, col_idx = np.where(mask)
-            row, col = row_idx[0], col_idx[0]
+        if keyword.lower() in index:
+            row, col = index[keyword.lower()]
 
             if keyword == 'coping':
-                # Coping은 표 형태 추출
-                points = df.iloc[row+1:row+9, col+1:col+3].dropna().values
-                return {'xz': points}
+                # Coping은 표 형태 추출 (빈 칸이 있는 행 제외)
+                points = cells[row+1:row+9, col+1:col+3]
+                return {'xz': points[~pd.isna(points).any(axis=1)]}
             elif keyword in ['rebar_x', 'rebar_y', 'rebar_z', 'column_tie', 'footing_top', 'footing_bottom']:
                 # rebar_x는 표 형태 추출
-                points = df.iloc[row+1:row+5, col+1:col+8].values
+                points = cells[row+1:row+5, col+1:col+8]
                 return {'': points}
             else:
                 # 일반적인 key-value 추출
-                values = [df.iloc[row+i+1, col+1] for i in range(len(keys))]
+                values = [cells[row+i+1, col+1] for i in range(len(keys))]
                 return dict(zip(keys, values))
 
     # ✅ 키워드별 반복 처리
-    for keyword, keys in keyword_config.items():
-        result = extract_data(keyword, keys)
-        if result:
-            concrete_data[keyword.lower()] = result            
+    with span('keyword extraction') as info:
+        for keyword, keys in keyword_config.items():
+            result = extract_data(keyword, keys)
+            if result:
+                concrete_data[keyword.lower()] = result            
+        info['n_sections'] = len(concrete_data)
 
 
-    ### 코핑 콘크리트 내부 라인(점) 추출
-    outer = Polygon(concrete_data['coping']['xz'])    
-    inner = outer.buffer(-concrete_data['coping_cover']['thickness'], join_style=2)  # 안쪽(음수) 오프셋 120mm 생성
-    
-    # Shapely 결과 → NumPy 변환 ===
-    inner_points = np.array(inner.exterior.coords)    
-    inner_points = inner_points[::-1]   # 기본 시계방향(buffer 기본)을 반시계방향으로 변환
-    
-    concrete_data['coping']['xz_inner'] = inner_points
-
-    # 3차원 좌표 생성  (# 1번 위치(y좌표)에 0 삽입)
-    concrete_data['coping']['xyz'] = np.insert(concrete_data['coping']['xz'], 1, 0, axis=1)  
-    concrete_data['coping']['xyz_inner'] = np.insert(concrete_data['coping']['xz_inner'], 1, 0, axis=1)
-    # 내부 맨 우측 피복 두께 만큼 이동
-    concrete_data['coping']['xyz_inner'][5][0] += concrete_data['coping_cover']['thickness']
-    concrete_data['coping']['xyz_inner'][6][0] += concrete_data['coping_cover']['thickness']
+    ### 코핑 콘크리트 내부 라인(점), 3차원 좌표
+    with span('inner offset (shapely)'):
+        concrete_data['coping'] = coping_points(concrete_data['coping']['xz'], concrete_data['coping_cover']['thickness'])
 
-    return concrete_data
+    with span('model'):
+        return CopingModel.from_dict(concrete_data)   # ✅ 철근 표 등은 여기서 한 번만 정리 / 검증
 
 
     
\ No newline at end of file
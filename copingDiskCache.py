@@ -0,0 +1,245 @@
+"""
+디스크 캐시 : create_volume / coping_rebar 결과 메시를 바이너리 파일로 저장 (서버 재시작, 다른 인스턴스에서 재사용)
+
+  파일     : [머리글 길이 (8 bytes)] [머리글 JSON] [배열 1] [배열 2] ...  (배열 시작은 64 bytes 정렬)
+             머리글 = 버전, key, 값 구조 (PolyData / MultiBlock / RebarInstances / dict / tuple), 배열 (dtype, shape, 위치)
+  읽기     : np.memmap (copy-on-write) 위의 배열을 그대로 VTK 배열로 사용 (읽을 때 복사 없음)
+  위치     : root/<버전>/<key 해시>.mesh  → 형상 코드 (GEOMETRY_MODULES) 가 바뀌면 버전이 바뀜
+             버전 폴더마다 표시 파일 (MARKER) 을 두고, 표시 파일이 있고 STALE_SECONDS 동안 쓰지 않은 다른 버전 폴더만 삭제
+             (root 의 다른 파일 / 폴더는 건드리지 않음, 같은 root 를 쓰는 다른 버전의 앱은 서로의 캐시를 지우지 않음)
+  크기 제한 : 전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은 파일부터 삭제 (사용 시각 = 파일 mtime)
+  사용     : COPING_DISK_CACHE 에 폴더를 지정한 경우만 (기본 사용 안 함)
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pyvista as pv
+from copingFcn import RebarInstances
+from copingMerged import CELL_KINDS, cell_arrays
+
+DISK_FORMAT = 1
+DISK_KINDS = ('volume', 'rebar_group')   # 디스크에 저장하는 캐시 key 종류 (key[0])
+GEOMETRY_MODULES = ('copingBasic.py', 'copingFcn.py', 'copingRebar.py', 'copingMerged.py', 'copingDiskCache.py')
+DISK_CACHE_MAX_BYTES = 2 * 1024**3
+ALIGN = 64
+ACTIVE_NAMES = ('scalars', 'normals', 'texture_coordinates')
+MARKER = '.coping_disk_cache'        # 이 캐시가 만든 버전 폴더 표시 (사용 시각 = mtime)
+STALE_SECONDS = 7 * 24 * 3600        # 이 기간 동안 쓰지 않은 다른 버전 폴더는 삭제
+
+
+def geometry_version():
+    """ 파일 형식 번호 + pyvista 버전 + 형상 코드 내용의 해시 → 캐시 버전 """
+    h = hashlib.sha1(f'{DISK_FORMAT}-{pv.__version__}'.encode())
+    folder = os.path.dirname(os.path.abspath(__file__))
+    for name in GEOMETRY_MODULES:
+        with open(os.path.join(folder, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def encode(value, arrays):
+    """ 캐시 값 → JSON 구조 (배열은 arrays 에 추가하고 번호만 기록) """
+    def add(array):
+        arrays.append(np.ascontiguousarray(array))
+        return len(arrays) - 1
+
+    def data_arrays(data):
+        for name, array in data.items():
+            if np.asarray(array).dtype == object:
+                raise TypeError(f'디스크 캐시에 저장할 수 없는 배열: {name}')
+        return {'arrays': {name: add(array) for name, array in data.items()},
+                'active': {active: getattr(data, f'active_{active}_name') for active in ACTIVE_NAMES}}
+
+    if isinstance(value, pv.PolyData):
+        cells = {attr: [add(array) for array in cell_arrays(value, getter)]
+                 for _, getter, attr in CELL_KINDS if getattr(value, getter)().GetNumberOfCells()}
+        return {'type': 'polydata', 'points': add(value.points), 'cells': cells,
+                'point_data': data_arrays(value.point_data), 'cell_data': data_arrays(value.cell_data)}
+    if isinstance(value, pv.MultiBlock):
+        return {'type': 'multiblock', 'names': list(value.keys()), 'blocks': [encode(block, arrays) for block in value]}
+    if isinstance(value, RebarInstances):
+        return {'type': 'instances', 'mesh': encode(value.mesh, arrays), 'offsets': add(value.offsets)}
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        return {'type': 'array', 'id': add(value)}
+    if isinstance(value, dict):
+        return {'type': 'dict', 'items': [[encode(k, arrays), encode(v, arrays)] for k, v in value.items()]}
+    if isinstance(value, (tuple, list)):
+        return {'type': type(value).__name__, 'items': [encode(v, arrays) for v in value]}
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        value = value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return {'type': 'value', 'value': value}
+    raise TypeError(f'디스크 캐시에 저장할 수 없는 값: {type(value).__name__}')
+
+
+def decode(node, arrays):
+    """ encode 의 반대 (arrays : 파일의 배열 목록) """
+    kind = node['type']
+    if kind == 'polydata':
+        mesh = pv.PolyData()
+        mesh.points = arrays[node['points']]
+        for attr, (offsets, connectivity) in node['cells'].items():
+            setattr(mesh, attr, pv.CellArray.from_arrays(arrays[offsets], arrays[connectivity]))
+        for data, saved in ((mesh.point_data, node['point_data']), (mesh.cell_data, node['cell_data'])):
+            for name, k in saved['arrays'].items():
+                data.set_array(arrays[k], name, deep_copy=False)
+            for active, name in saved['active'].items():
+                if name is not None:
+                    setattr(data, f'active_{active}_name', name)
+        return mesh
+    if kind == 'multiblock':
+        blocks = pv.MultiBlock()
+        for name, block in zip(node['names'], node['blocks']):
+            blocks.append(decode(block, arrays), name)
+        return blocks
+    if kind == 'instances':
+        return RebarInstances(decode(node['mesh'], arrays), arrays[node['offsets']])
+    if kind == 'array':
+        return arrays[node['id']]
+    if kind == 'dict':
+        return {decode(k, arrays): decode(v, arrays) for k, v in node['items']}
+    if kind in ('tuple', 'list'):
+        items = [decode(v, arrays) for v in node['items']]
+        return tuple(items) if kind == 'tuple' else items
+    return node['value']
+
+
+def is_version_folder(entry):
+    """ geometry_version 형식 (16자리 16진수) 이름이고 표시 파일이 있는 폴더 """
+    return (entry.is_dir() and len(entry.name) == 16 and all(c in '0123456789abcdef' for c in entry.name)
+            and os.path.isfile(os.path.join(entry.path, MARKER)))
+
+
+class DiskCache:
+    """ 메시 파일 캐시 (크기 제한 LRU, 여러 세션 / 프로세스가 같은 폴더를 써도 되도록 임시 파일 → 이름 변경으로 저장)
+    다른 프로세스가 추가한 파일은 이 프로세스가 시작할 때 목록에 포함 (그 사이 전체 크기는 잠시 한도를 넘을 수 있음)  """
+
+    def __init__(self, root, max_bytes=DISK_CACHE_MAX_BYTES, version=None):
+        self.version = version or geometry_version()
+        self.folder = os.path.join(root, self.version)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(self.folder, exist_ok=True)
+        with open(os.path.join(self.folder, MARKER), 'w', encoding='utf-8') as f:   # 표시 파일 작성 / 사용 시각 갱신
+            f.write(self.version)
+
+        # 오래 쓰지 않은 이전 버전 폴더 삭제 (형상 코드가 바뀐 뒤의 파일은 쓸 수 없음)
+        now = time.time()
+        for entry in os.scandir(root):
+            if entry.name == self.version or not is_version_folder(entry):
+                continue
+            try:
+                stale = now - os.stat(os.path.join(entry.path, MARKER)).st_mtime > STALE_SECONDS
+            except OSError:
+                continue
+            if stale:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+        files = [entry for entry in os.scandir(self.folder) if entry.name.endswith('.mesh')]
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        self.files = OrderedDict((entry.path, entry.stat().st_size) for entry in files)   # 경로 → 크기 (오래된 순)
+        self.total_bytes = sum(self.files.values())
+
+    def accepts(self, key):
+        return isinstance(key, tuple) and len(key) > 0 and key[0] in DISK_KINDS
+
+    def path(self, key):
+        return os.path.join(self.folder, hashlib.sha1(repr(key).encode()).hexdigest() + '.mesh')
+
+    def load(self, key, default=None):
+        """ 파일 → 값 (배열은 memmap 위의 view), 없거나 읽을 수 없으면 default """
+        path = self.path(key)
+        try:
+            mapped = np.memmap(path, dtype=np.uint8, mode='c')
+            n_header = int(mapped[:8].view('<u8')[0])
+            header = json.loads(bytes(mapped[8:8 + n_header]))
+            if header['version'] != self.version or header['key'] != repr(key):
+                return default
+            start = -(-(8 + n_header) // ALIGN) * ALIGN
+            arrays = []
+            for dtype, shape, offset in header['arrays']:
+                dtype = np.dtype(dtype)
+                nbytes = dtype.itemsize * int(np.prod(shape))
+                arrays.append(mapped[start + offset:start + offset + nbytes].view(dtype).reshape(shape))
+            value = decode(header['tree'], arrays)
+        except FileNotFoundError:
+            return default
+        except (OSError, ValueError, KeyError, TypeError):   # 손상된 파일은 삭제
+            self.remove(path)
+            return default
+
+        try:
+            os.utime(path)   # 사용 시각 (LRU)
+        except OSError:
+            pass
+        with self.lock:
+            if path in self.files:
+                self.files.move_to_end(path)
+        return value
+
+    def save(self, key, value):
+        """ 값 → 파일 (저장할 수 없는 값이면 False) """
+        arrays = []
+        try:
+            tree = encode(value, arrays)
+        except TypeError:
+            return False
+        offsets, offset = [], 0
+        for array in arrays:
+            offsets.append(offset)
+            offset += -(-array.nbytes // ALIGN) * ALIGN
+        header = json.dumps({'version': self.version, 'key': repr(key), 'tree': tree,
+                             'arrays': [[array.dtype.str, list(array.shape), k] for array, k in zip(arrays, offsets)]}).encode()
+        start = -(-(8 + len(header)) // ALIGN) * ALIGN
+
+        path = self.path(key)
+        with tempfile.NamedTemporaryFile(dir=self.folder, suffix='.tmp', delete=False) as f:
+            f.write(np.uint64(len(header)).astype('<u8').tobytes())
+            f.write(header)
+            for array, k in zip(arrays, offsets):
+                f.seek(start + k)
+                f.write(array.tobytes())
+            f.truncate(start + offset)
+        os.replace(f.name, path)
+
+        size = os.path.getsize(path)
+        with self.lock:
+            self.total_bytes += size - self.files.pop(path, 0)
+            self.files[path] = size
+            old = []
+            while self.total_bytes > self.max_bytes and len(self.files) > 1:
+                old_path, old_size = self.files.popitem(last=False)
+                self.total_bytes -= old_size
+                old.append(old_path)
+        for old_path in old:
+            try:
+                os.remove(old_path)
+            except OSError:   # Windows 에서 memmap 으로 열려 있는 파일 등
+                pass
+        return True
+
+    def remove(self, path):
+        with self.lock:
+            self.total_bytes -= self.files.pop(path, 0)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def disk_cache_from_env():
+    """ COPING_DISK_CACHE (폴더, 지정하지 않거나 0 이면 사용 안 함), COPING_DISK_CACHE_MB (최대 크기, 기본 2 GB) """
+    root = os.environ.get('COPING_DISK_CACHE', '')
+    if root in ('', '0'):
+        return None
+    max_mb = os.environ.get('COPING_DISK_CACHE_MB')
+    try:
+        return DiskCache(root, int(max_mb) * 1024**2 if max_mb else DISK_CACHE_MAX_BYTES)
+    except OSError:   # 쓸 수 없는 폴더면 메모리 캐시만 사용
+        return None
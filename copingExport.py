@@ -0,0 +1,158 @@
+import json
+import struct
+import numpy as np
+import pyvista as pv
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from copingFcn import RebarInstances
+
+GLTF_POINTS, GLTF_LINES, GLTF_TRIANGLES = 0, 1, 4
+
+
+def mesh_arrays(mesh):
+    """ PolyData → (점 좌표 float32 (n, 3), 인덱스 uint32, glTF 모드)
+    면이 있으면 삼각형, 없으면 선분 (폴리라인은 2점 선분으로 분할), 선도 없으면 점  """
+    if not isinstance(mesh, pv.PolyData):
+        mesh = mesh.extract_surface()
+    if mesh.GetNumberOfPolys() > 0 or mesh.GetNumberOfStrips() > 0:
+        tri = mesh.triangulate()
+        indices = tri.faces.reshape(-1, 4)[:, 1:]
+        return np.asarray(tri.points, dtype=np.float32), indices.astype(np.uint32).ravel(), GLTF_TRIANGLES
+
+    cells = mesh.GetLines()
+    if cells.GetNumberOfCells() == 0 and mesh.n_points > 0:
+        return np.asarray(mesh.points, dtype=np.float32), np.arange(mesh.n_points, dtype=np.uint32), GLTF_POINTS
+    conn = vtk_to_numpy(cells.GetConnectivityArray())
+    offsets = vtk_to_numpy(cells.GetOffsetsArray())
+    if len(conn) < 2:
+        return np.asarray(mesh.points, dtype=np.float32), np.zeros(0, dtype=np.uint32), GLTF_LINES
+    # 각 폴리라인의 마지막 점 → 다음 폴리라인의 첫 점은 연결하지 않음
+    keep = np.ones(len(conn) - 1, dtype=bool)
+    keep[offsets[1:-1] - 1] = False
+    indices = np.column_stack([conn[:-1][keep], conn[1:][keep]])
+    return np.asarray(mesh.points, dtype=np.float32), indices.astype(np.uint32).ravel(), GLTF_LINES
+
+
+def quantize_positions(points):
+    """ float 좌표 (n, 3) → int16 좌표 (n, 4, 정렬용 0 포함) + 복원 행렬 (4×4) : 좌표 = 행렬 @ (q, 1)
+    범위를 65535 단계로 나눔 (20 m 모델이면 약 0.3 mm)  """
+    lo, hi = points.min(axis=0).astype(float), points.max(axis=0).astype(float)
+    scale = np.where(hi > lo, (hi - lo) / 65535, 1.)
+    q = np.zeros((len(points), 4), dtype=np.int16)
+    q[:, :3] = np.round((points - lo) / scale) - 32768
+    matrix = np.diag([*scale, 1.])
+    matrix[:3, 3] = lo + 32768 * scale
+    return q, matrix
+
+
+def glb_bytes(meshes, quantize=False):
+    """ meshes: [(이름, 메시, 색상, 투명도[, extras[, 4×4 배치 행렬]]), ...] → glTF 2.0 바이너리 (bytes)
+    메시 : PolyData 또는 RebarInstances (형상 1개 + 이동량 → EXT_mesh_gpu_instancing)
+    extras : 노드 정보 (뷰어에서 필터링용), 같은 메시 객체는 버퍼에 한 번만 저장하고 노드만 추가
+    quantize : 좌표 int16 + 노드 복원 행렬 (KHR_mesh_quantization), 점이 65536개 미만이면 인덱스 uint16  """
+    gltf = {'asset': {'version': '2.0', 'generator': 'coping'}, 'scene': 0, 'scenes': [{'nodes': []}],
+            'nodes': [], 'meshes': [], 'materials': [], 'accessors': [], 'bufferViews': [], 'buffers': [],
+            'extensionsUsed': [], 'extensionsRequired': []}
+    chunks, offset = [], 0
+
+    def add_view(data, target=None, stride=None):
+        nonlocal offset
+        data = data.tobytes()
+        view = {'buffer': 0, 'byteOffset': offset, 'byteLength': len(data)}
+        if target is not None:
+            view['target'] = target
+        if stride is not None:
+            view['byteStride'] = stride
+        gltf['bufferViews'].append(view)
+        pad = (-len(data)) % 4   # 4 byte 정렬
+        chunks.append(data + b'\0' * pad)
+        offset += len(data) + pad
+        return len(gltf['bufferViews']) - 1
+
+    def add_accessor(accessor):
+        gltf['accessors'].append(accessor)
+        return len(gltf['accessors']) - 1
+
+    def use_extension(name):
+        if name not in gltf['extensionsUsed']:
+            gltf['extensionsUsed'].append(name)
+            gltf['extensionsRequired'].append(name)
+
+    def add_mesh(name, mesh, color, opacity):
+        """ → (glTF 메시 번호, 복원 행렬, 인스턴스 이동량 accessor 또는 None), 빈 메시는 None """
+        offsets = None
+        if isinstance(mesh, RebarInstances):
+            if len(mesh.offsets) == 0:
+                return None
+            if mesh.mesh.GetNumberOfPolys() + mesh.mesh.GetNumberOfStrips() == 0:   # 선 (rebar_scale=0) 인스턴싱은 three.js 가 지원하지 않음 → 펼침 (띠철근 고리는 strip)
+                mesh = mesh.merged()
+            else:
+                mesh, offsets = mesh.mesh, mesh.offsets
+        points, indices, mode = mesh_arrays(mesh)
+        if len(points) == 0 or len(indices) == 0:
+            return None
+
+        dequantize = np.eye(4)
+        if quantize:
+            use_extension('KHR_mesh_quantization')
+            q, dequantize = quantize_positions(points)
+            position = add_accessor({'bufferView': add_view(q, 34962, stride=8), 'componentType': 5122, 'count': len(q),
+                                     'type': 'VEC3', 'min': q[:, :3].min(axis=0).tolist(), 'max': q[:, :3].max(axis=0).tolist()})
+            if len(points) < 65536:
+                indices = indices.astype(np.uint16)
+        else:
+            position = add_accessor({'bufferView': add_view(points, 34962), 'componentType': 5126, 'count': len(points),
+                                     'type': 'VEC3', 'min': points.min(axis=0).tolist(), 'max': points.max(axis=0).tolist()})
+        index = add_accessor({'bufferView': add_view(indices, 34963), 'componentType': 5123 if indices.dtype == np.uint16 else 5125,
+                              'count': len(indices), 'type': 'SCALAR'})
+
+        translation = None
+        if offsets is not None:
+            # 인스턴스 이동은 노드 좌표계 (복원 행렬 적용 전) 기준 → 복원 배율로 나눔
+            use_extension('EXT_mesh_gpu_instancing')
+            local = (offsets / np.diag(dequantize)[:3]).astype(np.float32)
+            translation = add_accessor({'bufferView': add_view(local), 'componentType': 5126, 'count': len(local), 'type': 'VEC3'})
+
+        rgba = list(pv.Color(color, opacity=opacity).float_rgba)
+        gltf['materials'].append({'name': name, 'doubleSided': True,
+                                  'pbrMetallicRoughness': {'baseColorFactor': rgba, 'metallicFactor': 0, 'roughnessFactor': 1},
+                                  **({'alphaMode': 'BLEND'} if opacity < 1 else {})})
+        gltf['meshes'].append({'name': name, 'primitives': [{'attributes': {'POSITION': position}, 'indices': index,
+                                                             'material': len(gltf['materials']) - 1, 'mode': mode}]})
+        return len(gltf['meshes']) - 1, dequantize, translation
+
+    written = {}
+    for item in meshes:
+        name, mesh, color, opacity, extras, matrix = (*item, None, None)[:6]
+        if id(mesh) not in written:
+            written[id(mesh)] = add_mesh(name, mesh, color, opacity)
+        if written[id(mesh)] is None:
+            continue
+        n_mesh, dequantize, translation = written[id(mesh)]
+        node = {'name': name, 'mesh': n_mesh}
+        node_matrix = (np.eye(4) if matrix is None else np.asarray(matrix, dtype=float)) @ dequantize
+        if not np.allclose(node_matrix, np.eye(4)):
+            node['matrix'] = node_matrix.T.ravel().tolist()   # 열 우선 (column-major)
+        if translation is not None:
+            node['extensions'] = {'EXT_mesh_gpu_instancing': {'attributes': {'TRANSLATION': translation}}}
+        if extras:
+            node['extras'] = extras
+        gltf['nodes'].append(node)
+        gltf['scenes'][0]['nodes'].append(len(gltf['nodes']) - 1)
+
+    binary = b''.join(chunks)
+    if binary:
+        gltf['buffers'].append({'byteLength': len(binary)})
+    gltf = {key: value for key, value in gltf.items() if value != []}
+    header = json.dumps(gltf, separators=(',', ':')).encode()
+    header += b' ' * ((-len(header)) % 4)
+    body = struct.pack('<II', len(header), 0x4E4F534A) + header            # 'JSON'
+    if binary:
+        body += struct.pack('<II', len(binary), 0x004E4942) + binary       # 'BIN'
+    return struct.pack('<III', 0x46546C67, 2, 12 + len(body)) + body       # 'glTF'
+
+
+def write_glb(path, meshes, quantize=False):
+    """ glb_bytes 결과를 파일로 저장
+    렌더링 창(plotter) 없이 NumPy만으로 작성 (헤드리스 일괄 변환용)  """
+    with open(path, 'wb') as f:
+        f.write(glb_bytes(meshes, quantize=quantize))
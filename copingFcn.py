@@ -1,6 +1,7 @@
 import streamlit as st
 import numpy as np
 import pyvista as pv
+from vtkmodules.util.numpy_support import vtk_to_numpy
 
 def find2_intersection(p1, p2, line_p0, line_dir, tol=1e-6):
     """
@@ -72,6 +73,59 @@ def find2_point(concrete_data, line_p0, line_dir):
     return intersections
 
 
+def find2_intersections_with_polyline(polyline_points, line_p0, line_dir, tol=1e-6):
+    """
+    find2_intersection_with_polyline 의 벡터화 버전 (N개 직선 × 모든 선분을 한 번에 계산)
+    polyline_points: (S+1, 3),  line_p0, line_dir: (N, 3)
+    반환: (N, 2, 3) 교차점 배열 (코너 보정, 중복 제거 동일), 교점이 2개 미만인 행은 NaN
+    """
+    points = np.asarray(polyline_points)
+    p1 = points[:-1][None, :, :]                  # (1, S, 3)
+    r = (points[1:] - points[:-1])[None, :, :]    # (1, S, 3)
+    s = np.asarray(line_dir)[:, None, :]          # (N, 1, 3)
+    q = np.asarray(line_p0)[:, None, :] - p1      # (N, S, 3)
+
+    cross_rs = np.cross(r, s)
+    denom = np.sum(cross_rs * cross_rs, axis=-1)
+    cross_qs = np.cross(q, s)
+
+    # 선분과 직선이 평행(또는 거의 평행)인 경우 제외
+    parallel = denom < tol
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u = np.sum(cross_qs * cross_rs, axis=-1) / np.where(parallel, 1, denom).astype(denom.dtype)
+
+    # === 코너 근처 보정(clamp) ===
+    u = np.where((-tol <= u) & (u < 0), 0, u).astype(denom.dtype)
+    u = np.where((1 < u) & (u <= 1+tol), 1, u).astype(denom.dtype)
+    valid = ~parallel & (0 <= u) & (u <= 1)
+    inter_pt = p1 + u[:, :, None] * r             # (N, S, 3)
+
+    # 첫 번째 교점, 그 이후 첫 번째 교점과 겹치지 않는(코너 중복 방지) 두 번째 교점
+    n_line, n_seg = valid.shape
+    rows = np.arange(n_line)
+    i1 = np.argmax(valid, axis=1)
+    first = inter_pt[rows, i1]
+    close = np.all(np.abs(inter_pt - first[:, None, :]) <= tol + 1e-5 * np.abs(first[:, None, :]), axis=-1)
+    second = valid & ~close & (np.arange(n_seg)[None, :] > i1[:, None])
+    i2 = np.argmax(second, axis=1)
+
+    intersections = np.stack([first, inter_pt[rows, i2]], axis=1).astype(float)
+    intersections[~second.any(axis=1)] = np.nan
+    return intersections
+
+
+# 호출되는 Function ================================
+def find2_points(concrete_data, line_p0, line_dir):
+    """ find2_point 의 일괄 처리 버전 : line_p0, line_dir (N, 3) → (N, 2, 3) """
+
+    # 폴리라인(내부 코핑)
+    polyline_points = np.array(concrete_data['coping']['xyz_inner'], dtype=np.float32)
+    line_p0 = np.asarray(line_p0, dtype=np.float32).reshape(-1, 3)
+    line_dir = np.broadcast_to(np.asarray(line_dir, dtype=np.float32).reshape(-1, 3), line_p0.shape)
+
+    return find2_intersections_with_polyline(polyline_points, line_p0, line_dir)
+
+
 # 호출되는 Function ================================
 def create_rebar(rebar_scale, start_point, end_point, r_inner=0, r_outer=25/2):
     """ pv.Disc와 extrude를 사용해 중실원형/중공원형 단면의 Rebar를 생성하는 예시 코드
@@ -109,3 +163,127 @@ def create_rebar(rebar_scale, start_point, end_point, r_inner=0, r_outer=25/2):
         # rebar_scale <= 0이면 그냥 라인으로 처리
         return pv.Line(start_point, end_point)
 
+
+
+# 호출되는 Function ================================
+def create_rebars(rebar_scale, start_points, end_points, r_outer=25/2, n_sides=20):
+    """ 여러 개의 Rebar(중실원형)를 NumPy 벡터 연산으로 한 번에 생성 → 하나의 PolyData 반환
+    start_points, end_points: (N, 3) 배열,  r_outer: 스칼라 또는 (N,) 배열
+    create_rebar(Polygon + extrude)와 같은 형상 (캡 2개 + 측면 사각형 n_sides개)  """
+
+    start = np.asarray(start_points, dtype=float).reshape(-1, 3)
+    end = np.asarray(end_points, dtype=float).reshape(-1, 3)
+    radius = np.broadcast_to(np.asarray(r_outer, dtype=float), (len(start),)) * rebar_scale
+
+    # 길이 0인 철근은 제외 (create_rebar에서는 NaN 발생)
+    direction = end - start
+    length = np.linalg.norm(direction, axis=1)
+    valid = length > 0
+    start, end, radius = start[valid], end[valid], radius[valid]
+    direction, length = direction[valid], length[valid]
+    n_bar = len(start)
+    if n_bar == 0:
+        return pv.PolyData()
+
+    if rebar_scale <= 0:
+        # rebar_scale <= 0이면 그냥 라인으로 처리
+        points = np.stack([start, end], axis=1).reshape(-1, 3)
+        lines = np.column_stack([np.full(n_bar, 2), np.arange(0, 2*n_bar, 2), np.arange(1, 2*n_bar, 2)])
+        return pv.PolyData(points, lines=lines.ravel())
+
+    # 단면 좌표축 (u, v) : 철근 방향과 수직, u × v = 철근 방향
+    unit = direction / length[:, None]
+    helper = np.where(np.abs(unit[:, [2]]) < 0.9, [0., 0., 1.], [1., 0., 0.])
+    u = np.cross(unit, helper)
+    u /= np.linalg.norm(u, axis=1)[:, None]
+    v = np.cross(unit, u)
+
+    # 원주 방향 점 (N, n_sides, 3) → 시작/끝 단면 (N, 2*n_sides, 3)
+    theta = 2 * np.pi * np.arange(n_sides) / n_sides
+    ring = (np.cos(theta)[None, :, None] * u[:, None, :] + np.sin(theta)[None, :, None] * v[:, None, :]) * radius[:, None, None]
+    points = np.concatenate([start[:, None, :] + ring, end[:, None, :] + ring], axis=1).reshape(-1, 3)
+
+    # 철근 1개의 면 정보 (바깥쪽 법선) : 하단 캡, 측면 사각형, 상단 캡
+    j = np.arange(n_sides)
+    j1 = (j + 1) % n_sides
+    bottom = np.hstack([n_sides, j[::-1]])
+    sides = np.column_stack([np.full(n_sides, 4), j, j1, j1 + n_sides, j + n_sides]).ravel()
+    top = np.hstack([n_sides, j + n_sides])
+    template = np.hstack([bottom, sides, top])
+    is_index = np.ones(len(template), dtype=bool)
+    is_index[np.hstack([0, len(bottom) + j * 5, len(template) - len(top)])] = False
+
+    offsets = np.arange(n_bar) * (2 * n_sides)
+    faces = template[None, :] + offsets[:, None] * is_index[None, :]
+    return pv.PolyData(points, faces=faces.ravel())
+
+
+# 호출되는 Function ================================
+def replicate_mesh(mesh, offsets, instanced=False):
+    """ mesh를 offsets (M, 3) 만큼 이동한 복사본들을 하나의 PolyData로 생성
+    copy(deep=True) → translate → pv.merge 반복 대신, 점 배열을 broadcast로 한 번에 작성
+    instanced=True 이면 형상 1개 + 이동량만 저장 (RebarInstances 반환)  """
+
+    offsets = np.asarray(offsets, dtype=float).reshape(-1, 3)
+    if instanced:
+        return RebarInstances(mesh, offsets)
+
+    n_copy, n_points = len(offsets), mesh.n_points
+    if n_copy == 0 or n_points == 0:
+        return pv.PolyData()
+
+    points = (mesh.points[None, :, :] + offsets[:, None, :]).reshape(-1, 3)
+    shift = np.arange(n_copy) * n_points   # 복사본별 점 번호 증가량
+
+    cells = {}
+    for name, vtk_cells in (('verts', mesh.GetVerts()), ('lines', mesh.GetLines()), ('faces', mesh.GetPolys()),
+                            ('strips', mesh.GetStrips())):
+        n_cells = vtk_cells.GetNumberOfCells()
+        if n_cells == 0:
+            continue
+        # padded 배열 [n, i0, i1, ..., n, ...] 에서 개수(n) 위치를 제외한 인덱스만 이동
+        padded = getattr(mesh, name)
+        is_index = np.ones(len(padded), dtype=bool)
+        is_index[vtk_to_numpy(vtk_cells.GetOffsetsArray())[:-1] + np.arange(n_cells)] = False
+        cells[name] = (padded[None, :] + shift[:, None] * is_index[None, :]).ravel()
+
+    tiled = pv.PolyData(points, **cells)
+    for name, array in mesh.point_data.items():
+        tiled.point_data[name] = np.tile(array, (n_copy,) + (1,) * (array.ndim - 1))
+    for name, array in mesh.cell_data.items():
+        tiled.cell_data[name] = np.tile(array, (n_copy,) + (1,) * (array.ndim - 1))
+    return tiled
+
+
+class RebarInstances:
+    """ 인스턴싱 철근 그룹 : 기본 형상(mesh) 1개 + 복사 위치(offsets)
+    plotter에는 mapper를 공유하는 actor를 offset 개수만큼 추가 (형상 데이터는 1벌만 사용)  """
+
+    def __init__(self, mesh, offsets):
+        self.mesh = mesh
+        self.offsets = np.asarray(offsets, dtype=float).reshape(-1, 3)
+
+    @property
+    def n_points(self):
+        return self.mesh.n_points * len(self.offsets)
+
+    @property
+    def n_cells(self):
+        return self.mesh.n_cells * len(self.offsets)
+
+    def merged(self):
+        """ 복사본을 실제로 생성한 하나의 PolyData """
+        return replicate_mesh(self.mesh, self.offsets)
+
+    def add_to_plotter(self, plotter, **kwargs):
+        if len(self.offsets) == 0:
+            return []
+        actor = plotter.add_mesh(self.mesh, **kwargs)
+        actor.position = self.offsets[0]
+        actors = [actor]
+        for offset in self.offsets[1:]:
+            instance = pv.Actor(mapper=actor.mapper, prop=actor.prop)
+            instance.position = offset
+            plotter.add_actor(instance, reset_camera=False)
+            actors.append(instance)
+        return actors
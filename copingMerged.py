@@ -0,0 +1,133 @@
+"""
+철근 단일 메시 : 모든 (종류, 직경) 그룹을 PolyData 1개로 (actor 1개 → draw call 1번)
+
+  셀 배열 : type_id (types 번호), dia, bar_id (copingClash / copingCover 의 철근 번호와 같음), color (RGB)
+  index   : (종류, 직경) → 점 구간, 선 / 면 셀 구간 (그룹마다 연속 : 그룹 순서대로 이어 붙임)
+  필터    : 선택한 그룹의 구간만 잘라 붙인 PolyData (rebar_subset, 그룹 반복문 없이 NumPy 인덱싱)
+"""
+import numpy as np
+import pyvista as pv
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from copingBasic import color_map
+from copingFcn import RebarInstances
+from copingProfile import profiled
+
+# VTK PolyData 셀 종류 (셀 번호 순서) : (이름, vtkCellArray getter, pyvista 속성)
+CELL_KINDS = (('verts', 'GetVerts', 'verts'), ('lines', 'GetLines', 'lines'),
+              ('polys', 'GetPolys', 'faces'), ('strips', 'GetStrips', 'strips'))
+
+def bar_count(bars):
+    """ 배치 1개의 철근 수 (길이 0 인 철근 제외, 복사본 포함) """
+    if 'center' in bars:
+        return len(bars['center'])
+    n_copy = 1 if bars['offsets'] is None else len(bars['offsets'])
+    return int((np.linalg.norm(bars['end'] - bars['start'], axis=1) > 0).sum()) * n_copy
+
+
+def range_index(starts, stops):
+    """ 구간 [start, stop) 여러 개를 이어 붙인 인덱스 배열 """
+    n = stops - starts
+    return np.repeat(starts - (np.cumsum(n) - n), n) + np.arange(n.sum())
+
+
+def cell_arrays(mesh, getter):
+    """ PolyData 의 한 종류 셀 (getter : 'GetLines' 등) → (offsets, connectivity) """
+    cells = getattr(mesh, getter)()
+    if cells.GetNumberOfCells() == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return vtk_to_numpy(cells.GetOffsetsArray()).astype(np.int64), vtk_to_numpy(cells.GetConnectivityArray()).astype(np.int64)
+
+
+@profiled('merged_rebar')
+def merged_rebar(rebar, layout):
+    """ coping_rebar 결과 + rebar_layout → {'mesh', 'keys', 'types', 'points', 'cells'}
+    points : (K, 2) 그룹별 점 구간,  cells : {'verts' / 'lines' / 'polys' / 'strips': (K, 2)} 종류별 그룹 셀 구간
+    VTK 셀 번호는 종류 순서 (점 → 선 → 면 → strip, 띠철근 고리는 strip) → 셀 배열도 같은 순서
+    인스턴싱 그룹 (RebarInstances) 은 복사본을 펼쳐서 합침  """
+    keys = [key for key in layout if key in rebar]
+    meshes = [rebar[key].merged() if isinstance(rebar[key], RebarInstances) else rebar[key] for key in keys]
+    types = list(dict.fromkeys(r_type for r_type, _ in keys))
+
+    n_points = np.array([mesh.n_points for mesh in meshes], dtype=np.int64)
+    point_start = np.cumsum(n_points) - n_points
+    cells, arrays, n_cells = {}, {}, {}
+    for kind, getter, _ in CELL_KINDS:
+        parts = [cell_arrays(mesh, getter) for mesh in meshes]
+        counts = np.array([len(offsets) - 1 for offsets, _ in parts], dtype=np.int64)
+        conn_start = np.cumsum([len(conn) for _, conn in parts]) - [len(conn) for _, conn in parts]
+        offsets = np.concatenate([[0]] + [offsets[1:] + start for (offsets, _), start in zip(parts, conn_start)])
+        connectivity = np.concatenate([np.zeros(0, dtype=np.int64)] + [conn + p0 for (_, conn), p0 in zip(parts, point_start)])
+        arrays[kind] = (offsets, connectivity)
+        cells[kind] = np.column_stack([np.cumsum(counts) - counts, np.cumsum(counts)])
+        n_cells[kind] = counts
+
+    mesh = pv.PolyData()   # PolyData(points) 는 점마다 vertex 셀을 만들므로 점만 따로 지정
+    mesh.points = np.vstack([mesh.points for mesh in meshes]) if keys else np.zeros((0, 3))
+    for kind, _, attr in CELL_KINDS:
+        if len(arrays[kind][1]):
+            setattr(mesh, attr, pv.CellArray.from_arrays(*arrays[kind]))
+
+    # 셀 배열 : 그룹 번호 (셀 종류 순서), 그룹 안에서의 셀 순서 → 철근 번호 (그룹 안에서 철근마다 셀 수가 같음)
+    group, local = [], []
+    before = np.zeros(len(keys), dtype=np.int64)   # 그룹별 앞 종류의 셀 수
+    for kind, _, _ in CELL_KINDS:
+        group.append(np.repeat(np.arange(len(keys)), n_cells[kind]))
+        local.append(range_index(before, before + n_cells[kind]))
+        before = before + n_cells[kind]
+    group, local = np.concatenate(group), np.concatenate(local)
+    n_bars = np.array([bar_count(layout[key]) for key in keys], dtype=np.int64)
+    bar_start = np.cumsum(n_bars) - n_bars
+    cells_per_bar = np.maximum(before // np.maximum(n_bars, 1), 1)
+    type_id = np.array([types.index(r_type) for r_type, _ in keys], dtype=np.int32)
+    rgb = np.array([pv.Color(color_map.get(r_type, 'green')).int_rgb for r_type, _ in keys], dtype=np.uint8).reshape(-1, 3)
+    mesh.cell_data['type_id'] = type_id[group]
+    mesh.cell_data['dia'] = np.array([dia for _, dia in keys], dtype=np.float32)[group]
+    mesh.cell_data['bar_id'] = bar_start[group] + local // cells_per_bar[group]
+    mesh.cell_data['color'] = rgb[group]
+    mesh.cell_data.active_scalars_name = 'color'
+    return {'mesh': mesh, 'keys': keys, 'types': types,
+            'points': np.column_stack([point_start, point_start + n_points]), 'cells': cells}
+
+
+def select_keys(merged, part=None, rebar_type='All', rebar_dia='All'):
+    """ 뷰 (part : 종류 이름에 포함), 타입, 직경 필터 → 선택된 그룹 번호 """
+    keys = merged['keys']
+    if not keys:
+        return np.zeros(0, dtype=np.int64)
+    names = np.array([r_type for r_type, _ in keys])
+    dias = np.array([int(dia) for _, dia in keys])
+    keep = np.char.find(names, part or '') >= 0
+    if rebar_type != 'All':
+        keep &= names == rebar_type
+    if rebar_dia != 'All':
+        keep &= dias == int(rebar_dia)
+    return np.flatnonzero(keep)
+
+
+def rebar_subset(merged, selected):
+    """ 선택된 그룹 (select_keys) 만 담은 PolyData : 점 / 셀 구간을 잘라 이어 붙임 (셀 배열 포함) """
+    mesh = merged['mesh']
+    if len(selected) == len(merged['keys']):
+        return mesh
+    p0, p1 = merged['points'][selected, 0], merged['points'][selected, 1]
+    shift = (np.cumsum(p1 - p0) - (p1 - p0)) - p0   # 그룹별 점 번호 변경량
+    subset = pv.PolyData()
+    subset.points = mesh.points[range_index(p0, p1)] if len(selected) else np.zeros((0, 3))
+
+    cell_ids, first = [], 0   # first : 이 종류 첫 셀의 번호 (앞 종류 셀 수 합)
+    for kind, getter, attr in CELL_KINDS:
+        ranges = merged['cells'][kind]
+        c0, c1 = ranges[selected, 0], ranges[selected, 1]
+        if (c1 - c0).sum():
+            offsets, connectivity = cell_arrays(mesh, getter)
+            conn = connectivity[range_index(offsets[c0], offsets[c1])] + np.repeat(shift, offsets[c1] - offsets[c0])
+            sizes = np.diff(offsets)[range_index(c0, c1)]
+            setattr(subset, attr, pv.CellArray.from_arrays(np.concatenate([[0], np.cumsum(sizes)]), conn))
+            cell_ids.append(first + range_index(c0, c1))
+        first += ranges[-1, 1] if len(ranges) else 0
+
+    cell_ids = np.concatenate(cell_ids) if cell_ids else np.zeros(0, dtype=np.int64)
+    for name in mesh.cell_data.keys():
+        subset.cell_data[name] = mesh.cell_data[name][cell_ids]
+    subset.cell_data.active_scalars_name = 'color'
+    return subset
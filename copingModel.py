@@ -0,0 +1,249 @@
+import hashlib
+import io
+import re
+from dataclasses import dataclass, fields
+import numpy as np
+
+MODEL_VERSION = 1
+
+# 철근 표 1열 = (개수, 간격, 직경, 직경2)  (빈 칸은 NaN)
+#   - 엑셀 표의 1~4행에 해당, 직경 문자열('H25' 등)은 읽을 때 한 번만 숫자로 변환
+#   - 직경2 : rebar_x 표의 4번째 행 (y 방향 리바 직경)
+BAR_DTYPE = np.dtype([('count', 'f8'), ('spacing', 'f8'), ('dia', 'f8'), ('dia2', 'f8')])
+
+
+def parse_dia(value):
+    """ 'H25', 'S19', 25 → 25.0  (빈 칸, 숫자 없음 → NaN) """
+    if isinstance(value, str):
+        digits = re.findall(r'\d+', value)
+        return float(digits[0]) if digits else np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class Section:
+    """ 구역 데이터 공통 : model['column']['height'] 처럼 기존 dict 방식 접근도 지원 """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def keys(self):
+        return [f.name for f in fields(self)]
+
+    def values(self):
+        return [getattr(self, f.name) for f in fields(self)]
+
+    def items(self):
+        return list(zip(self.keys(), self.values()))
+
+
+@dataclass(slots=True)
+class BarTable(Section):
+    rows: np.ndarray   # BAR_DTYPE 구조 배열 (엑셀 표의 열 개수만큼)
+
+    @classmethod
+    def from_cells(cls, cells):
+        """ 엑셀 표 (4행 × n열 object 배열) → BarTable """
+        cells = np.asarray(cells, dtype=object)
+        rows = np.full(cells.shape[1], np.nan, dtype=BAR_DTYPE)
+        for name, converter, r in (('count', to_float, 0), ('spacing', to_float, 1), ('dia', parse_dia, 2), ('dia2', parse_dia, 3)):
+            if r < len(cells):
+                rows[name] = [converter(v) for v in cells[r]]
+        return cls(rows)
+
+    def valid_rows(self, *names, start=0, stop=None):
+        """ start 열부터 names 값이 모두 있는 연속된 열 (첫 빈 칸에서 중단) """
+        rows = self.rows[start:stop]
+        invalid = np.zeros(len(rows), dtype=bool)
+        for name in names:
+            invalid |= np.isnan(rows[name])
+        return rows[:np.argmax(invalid)] if invalid.any() else rows
+
+
+@dataclass(slots=True)
+class Length(Section):
+    x: float
+    y: float
+    z: float
+
+
+@dataclass(slots=True)
+class Coping(Section):
+    xz: np.ndarray          # 외곽 (n, 2)
+    xz_inner: np.ndarray    # 피복 안쪽 (n, 2)
+    xyz: np.ndarray         # 외곽 3차원 (n, 3), y = 0
+    xyz_inner: np.ndarray   # 피복 안쪽 3차원 (n, 3)
+
+
+@dataclass(slots=True)
+class CopingZ(Section):
+    z1: float
+    z2: float
+    z3: float
+
+
+@dataclass(slots=True)
+class CopingX(Section):
+    x1: float
+    x2: float
+    x3: float
+
+
+@dataclass(slots=True)
+class CopingCover(Section):
+    thickness: float
+
+
+@dataclass(slots=True)
+class Column(Section):
+    height: float
+    diameter: float
+    cover: float
+
+
+@dataclass(slots=True)
+class ColumnRebar(Section):
+    dia: float
+    num: float
+    layer: float
+    length_top: float
+    length_rebar: float
+
+
+@dataclass(slots=True)
+class ColumnCross(Section):
+    dia: float
+    num: float
+    spacing: float
+    length_bottom: float
+
+
+@dataclass(slots=True)
+class Footing(Section):
+    height: float
+    cover_upper: float
+    cover_lower: float
+    length_x: float
+    length_y: float
+    cover_xy: float
+    ver_dia: float
+    v_num: float
+    v_spacing: float
+
+
+@dataclass(slots=True)
+class FootingVer(Section):
+    v1: float
+    v2: float
+    v3: float
+    v4: float
+    v5: float
+    v6: float
+
+
+@dataclass(slots=True)
+class CopingModel(Section):
+    """ 입력 데이터 전체 (concrete_data) : 읽을 때 한 번 검증 / 정리 """
+    length: Length
+    coping: Coping
+    coping_z: CopingZ
+    coping_x: CopingX
+    coping_cover: CopingCover
+    rebar_x: BarTable
+    rebar_y: BarTable
+    rebar_z: BarTable
+    column: Column
+    column_rebar: ColumnRebar
+    column_cross: ColumnCross
+    column_tie: BarTable
+    footing: Footing
+    footing_ver: FootingVer
+    footing_top: BarTable
+    footing_bottom: BarTable
+
+    @classmethod
+    def from_dict(cls, concrete_data):
+        """ get_coping_data 의 키워드별 dict → CopingModel (키워드 누락 시 ValueError) """
+        missing = [f.name for f in fields(cls) if f.name not in concrete_data]
+        if missing:
+            raise ValueError(f"입력 파일에 키워드가 없습니다: {', '.join(missing)}")
+
+        sections = {}
+        for f in fields(cls):
+            data = concrete_data[f.name]
+            if f.type is BarTable:
+                sections[f.name] = BarTable.from_cells(data[''])
+            elif f.type is Coping:
+                sections[f.name] = Coping(**{key: np.asarray(data[key], dtype=float) for key in ('xz', 'xz_inner', 'xyz', 'xyz_inner')})
+            else:
+                sections[f.name] = f.type(**{g.name: to_float(data.get(g.name)) for g in fields(f.type)})
+        return cls(**sections)
+
+    def to_bytes(self):
+        """ 바이너리 저장 (NumPy npz, openpyxl 없이 다시 읽기 가능) """
+        arrays = {'version': np.array(MODEL_VERSION)}
+        for f in fields(self):
+            section = getattr(self, f.name)
+            if isinstance(section, BarTable):
+                arrays[f.name] = section.rows
+            else:
+                for key, value in section.items():
+                    arrays[f'{f.name}.{key}'] = np.asarray(value, dtype=float)
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            if int(npz['version']) != MODEL_VERSION:
+                raise ValueError(f"모델 파일 버전이 다릅니다: {int(npz['version'])} (현재 {MODEL_VERSION})")
+            sections = {}
+            for f in fields(cls):
+                if f.type is BarTable:
+                    sections[f.name] = BarTable(npz[f.name])
+                else:
+                    values = {g.name: npz[f'{f.name}.{g.name}'] for g in fields(f.type)}
+                    if f.type is not Coping:
+                        values = {key: float(value) for key, value in values.items()}
+                    sections[f.name] = f.type(**values)
+        return cls(**sections)
+
+    def section_digests(self):
+        """ 구역 이름 → 내용 해시 (구역별 변경 확인용) """
+        digests = {}
+        for f in fields(self):
+            h = hashlib.sha1()
+            for key, value in getattr(self, f.name).items():
+                value = np.asarray(value)
+                h.update(f'{key}{value.dtype}{value.shape}'.encode())
+                h.update(np.ascontiguousarray(value).tobytes())
+            digests[f.name] = h.hexdigest()[:16]
+        return digests
+
+    def changed_sections(self, previous):
+        """ 이전 모델과 내용이 다른 구역 이름 목록 (previous 가 None 이면 전체) """
+        digests = self.section_digests()
+        if previous is None:
+            return list(digests)
+        old = previous.section_digests()
+        return [name for name, digest in digests.items() if old.get(name) != digest]
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
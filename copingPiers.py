@@ -0,0 +1,126 @@
+"""
+다중 교각 : 입력 시트의 Piers 표 (교각마다 위치 / 회전 / 입력값 변경)
+
+  Piers
+  name | station | offset | rotation | overrides
+  P1   | 0       | 0      | 0        |
+  P2   | 40000   | 0      | 0        | column.height=15000
+  P3   | 80000   | 500    | 5        | column.height=15000; footing.length_x=8000
+
+station : 교량 축(x) 방향 위치 [mm], offset : 직각(y) 방향 [mm], rotation : z축 회전 [도]
+overrides : '구역.항목=값' 을 ; 로 구분 (숫자 항목만, coping_cover.thickness 는 내부 라인 다시 계산)
+입력값이 같은 교각은 형상을 한 번만 만들고 변환 행렬로 배치
+"""
+import dataclasses
+import hashlib
+import numpy as np
+import pandas as pd
+from copingData import read_sheet, keyword_index, coping_points
+from copingModel import BarTable, Coping
+from copingTakeoff import rebar_takeoff
+
+PIER_COLUMNS = ('name', 'station', 'offset', 'rotation', 'overrides')
+
+
+def parse_overrides(text):
+    """ 'column.height=15000; footing.length_x=8000' → {('column', 'height'): 15000.0, ...} """
+    overrides = {}
+    if not isinstance(text, str):
+        return overrides
+    for item in text.replace(',', ';').split(';'):
+        if not item.strip():
+            continue
+        name, _, value = item.partition('=')
+        section, _, key = name.strip().lower().partition('.')
+        try:
+            overrides[(section, key)] = float(value)
+        except ValueError:
+            raise ValueError(f'교각 입력값 변경 형식 오류: {item.strip()} (예: column.height=15000)')
+    return overrides
+
+
+def read_piers(uploaded_file=None):
+    """ 입력 시트의 Piers 표 → [{'name', 'station', 'offset', 'rotation', 'overrides'}, ...] (표가 없으면 []) """
+    if uploaded_file is None:
+        uploaded_file = "coping_input.xlsx"
+    name = uploaded_file if isinstance(uploaded_file, str) else getattr(uploaded_file, 'name', '')
+    if str(name).lower().endswith('.npz'):   # 저장된 모델에는 교각 목록 없음
+        return []
+    cells = read_sheet(uploaded_file)
+    index = keyword_index(cells)
+    if 'piers' not in index:
+        return []
+
+    row, col = index['piers']
+    piers = []
+    for values in cells[row+2:, col:col+len(PIER_COLUMNS)]:
+        values = list(values) + [np.nan] * (len(PIER_COLUMNS) - len(values))
+        if pd.isna(values[0]):   # 이름이 빈 칸이면 표 끝
+            break
+        pier = dict(zip(PIER_COLUMNS, values))
+        piers.append({'name': str(pier['name']),
+                      'station': 0. if pd.isna(pier['station']) else float(pier['station']),
+                      'offset': 0. if pd.isna(pier['offset']) else float(pier['offset']),
+                      'rotation': 0. if pd.isna(pier['rotation']) else float(pier['rotation']),
+                      'overrides': parse_overrides(pier['overrides'])})
+    return piers
+
+
+def apply_overrides(model, overrides):
+    """ 교각별 입력값 변경 → 새 CopingModel (원래 모델은 그대로) """
+    if not overrides:
+        return model
+    changes = {}
+    for (section, key), value in overrides.items():
+        if section not in model.keys() or isinstance(model[section], (BarTable, Coping)) or key not in model[section].keys():
+            raise ValueError(f'교각별로 변경할 수 없는 항목: {section}.{key}')
+        changes.setdefault(section, {})[key] = value
+    changes = {section: dataclasses.replace(model[section], **values) for section, values in changes.items()}
+    if 'coping_cover' in changes:   # 피복이 바뀌면 코핑 내부 라인도 다시 계산
+        changes['coping'] = Coping(**coping_points(model['coping']['xz'], changes['coping_cover']['thickness']))
+    return dataclasses.replace(model, **changes)
+
+
+def pier_matrix(station=0., offset=0., rotation=0.):
+    """ 교각 배치 변환 행렬 (4×4) : z축 회전 [도] 후 (station, offset, 0) 이동 """
+    theta = np.radians(rotation)
+    matrix = np.eye(4)
+    matrix[:2, :2] = [[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]]
+    matrix[:2, 3] = [station, offset]
+    return matrix
+
+
+def model_digest(model):
+    """ 모델 전체 내용 해시 (같은 설계인지 확인) """
+    return hashlib.sha1('-'.join(model.section_digests().values()).encode()).hexdigest()
+
+
+def pier_designs(model, piers):
+    """ 교각 목록 → 설계(입력값이 같은 교각 묶음) 목록
+    [{'model': CopingModel, 'digest': 해시, 'piers': [이름, ...], 'matrices': (n, 4, 4)}, ...]  """
+    designs, models = {}, {}
+    for pier in piers:
+        key = tuple(sorted(pier['overrides'].items()))
+        if key not in models:
+            models[key] = apply_overrides(model, pier['overrides'])
+        pier_model = models[key]
+        digest = model_digest(pier_model)
+        design = designs.setdefault(digest, {'model': pier_model, 'digest': digest, 'piers': [], 'matrices': []})
+        design['piers'].append(pier['name'])
+        design['matrices'].append(pier_matrix(pier['station'], pier['offset'], pier['rotation']))
+    for design in designs.values():
+        design['matrices'] = np.array(design['matrices'])
+    return list(designs.values())
+
+
+def piers_takeoff(designs):
+    """ 전체 교각 철근 물량 (설계별 물량 × 교각 수 합산) """
+    takeoffs = []
+    for design in designs:
+        takeoff = rebar_takeoff(design['model'])
+        n = len(design['piers'])
+        takeoff[['count', 'length_m', 'mass_kg']] *= n
+        takeoffs.append(takeoff)
+    takeoff = pd.concat(takeoffs, ignore_index=True)
+    return takeoff.groupby(['type', 'dia'], as_index=False, sort=True).agg(
+        {'count': 'sum', 'length_m': 'sum', 'unit_weight_kg_m': 'first', 'mass_kg': 'sum'})
@@ -0,0 +1,108 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+local = threading.local()   # 세션(스크립트 실행 스레드)별 현재 프로파일러
+
+
+def current_rss():
+    """ 현재 RSS [bytes] (Linux는 /proc, 그 외에는 최대 RSS) """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Profiler:
+    """ 단계별 측정 구간 기록 : 시작 / 소요 시간, 중첩 깊이, RSS 변화량, 철근 / 점 개수 등 """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.depths = {}   # 스레드별 중첩 깊이 (작업 스레드에서도 같은 프로파일러 사용)
+
+    @contextmanager
+    def span(self, name, **args):
+        tid = threading.get_ident()
+        depth = self.depths.get(tid, 0)
+        record = {'name': name, 'start': time.perf_counter() - self.origin, 'duration': 0.,
+                  'depth': depth, 'rss_delta': 0, 'tid': tid, 'args': args}
+        self.spans.append(record)   # 시작 순서로 기록 (중첩 구간은 부모 다음)
+        rss = current_rss()
+        self.depths[tid] = depth + 1
+        try:
+            yield args   # 구간 안에서 info['n_bars'] = ... 처럼 개수 추가
+        finally:
+            self.depths[tid] = depth
+            record['duration'] = time.perf_counter() - self.origin - record['start']
+            record['rss_delta'] = current_rss() - rss
+
+    def table(self):
+        """ 사이드바 표시용 행 목록 (이름은 중첩 깊이만큼 들여쓰기) """
+        return [{'stage': '  ' * s['depth'] + s['name'], 'ms': s['duration'] * 1000,
+                 'rss_MB': s['rss_delta'] / 1024**2,
+                 'info': ', '.join(f'{k}={v}' for k, v in s['args'].items())} for s in self.spans]
+
+    def chrome_trace(self):
+        """ Chrome (chrome://tracing) / Perfetto 에서 열 수 있는 JSON (bytes) """
+        pid = os.getpid()
+        events = [{'name': s['name'], 'cat': 'coping', 'ph': 'X', 'pid': pid, 'tid': s['tid'],
+                   'ts': s['start'] * 1e6, 'dur': s['duration'] * 1e6,
+                   'args': {**s['args'], 'rss_delta_mb': round(s['rss_delta'] / 1024**2, 3)}} for s in self.spans]
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, default=str).encode()
+
+
+@contextmanager
+def span(name, **args):
+    """ 측정 구간 (현재 스레드에 프로파일러가 없으면 아무 것도 기록하지 않음)
+    with span('excel load') as info: ... info['n_cells'] = cells.size  """
+    profiler = getattr(local, 'profiler', None)
+    if profiler is None:
+        yield args
+        return
+    with profiler.span(name, **args) as info:
+        yield info
+
+
+def profiled(name):
+    """ 함수 전체를 측정 구간으로 기록하는 데코레이터 """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_profiler():
+    return getattr(local, 'profiler', None)
+
+
+def call_with_profiler(profiler, depth, func, *args, **kwargs):
+    """ 작업 스레드에서 호출한 쪽의 프로파일러로 측정 (ThreadPoolExecutor.submit 용)
+    depth : 작업 스레드 구간의 중첩 깊이 시작값 (호출한 쪽 구간 아래로 표시)  """
+    if profiler is None:
+        return func(*args, **kwargs)
+    local.profiler = profiler
+    profiler.depths[threading.get_ident()] = depth
+    try:
+        return func(*args, **kwargs)
+    finally:
+        local.profiler = None
+
+
+def start_profile():
+    local.profiler = Profiler()
+    return local.profiler
+
+
+def stop_profile():
+    profiler = getattr(local, 'profiler', None)
+    local.profiler = None
+    return profiler
@@ -1,386 +1,480 @@
-import re
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
 import pyvista as pv
 import numpy as np
-import pandas as pd
 import streamlit as st
-from copingFcn import create_rebar, find2_point
+from copingFcn import create_rebars, find2_points, replicate_mesh
+from copingProfile import span, profiled, current_profiler, call_with_profiler
+
+def cumulative_distance(rows):
+    """ BarTable.valid_rows 결과 (개수, 간격) → 철근 1개마다 누적 거리 배열 """
+    return np.cumsum(np.repeat(rows['spacing'], rows['count'].astype(int)))
+
+def add_rebar(layout, r_type, dia, start, end):
+    bars = layout.setdefault((r_type, dia), {'start': np.zeros((0, 3)), 'end': np.zeros((0, 3)), 'offsets': None})
+    bars['start'] = np.vstack([bars['start'], np.reshape(start, (-1, 3))])
+    bars['end'] = np.vstack([bars['end'], np.reshape(end, (-1, 3))])
+
+def add_rebar_rows(layout, r_type, dias, start, end):
+    """ 철근 1개마다 직경 배열(dias) → 직경별로 묶어서 추가 (표 순서 유지) """
+    for dia in dict.fromkeys(dias):
+        mask = dias == dia
+        add_rebar(layout, r_type, dia, start[mask], end[mask])
+
+def copy_rebar(layout, loop_type, offsets):
+    # 같은 종류의 모든 (r_type, dia) 철근을 offsets 위치로 복사 (원래 위치는 제외)
+    for (r_type, dia), bars in layout.items():
+        if r_type == loop_type:
+            bars['offsets'] = offsets
+
+def column_center(concrete_data):
+    """ 기둥 중심 (x, y) : 코핑 하면 중앙 """
+    outer_points = concrete_data['coping']['xyz']
+    return (outer_points[2][0] + outer_points[3][0]) / 2, concrete_data['length']['y'] / 2
 
-def coping_rebar(rebar_scale, concrete_data):
-    length = concrete_data['length']
-    cover = concrete_data['coping_cover']['thickness']
-    inner_points = concrete_data['coping']['xyz_inner']
-    column = concrete_data['column']
+def column_bottom(concrete_data):
+    """ 기둥 cross rebar / 기초 철근 기준점 (center_bottom) """
+    xc, yc = column_center(concrete_data)
+    return (xc, yc, -concrete_data['column']['height']/2 - concrete_data['column_cross']['length_bottom'])
 
-    rebar_dict = {}  # (종류, 직경)을 key로 하고, [mesh, mesh, ...]를 value로 하는 딕셔너리
-    def add_rebar(r_type, dia, mesh):
-        rebar_dict.setdefault((r_type, dia), []).append(mesh)
 
-    # ----------------------------------------------------
-    # 1) 최외곽 리바 (outer)
-    # ----------------------------------------------------
+# ----------------------------------------------------
+# 철근 그룹별 배치
+# ----------------------------------------------------
+def layout_coping_outer(concrete_data):
+    # 최외곽 리바 (outer) → y방향 복사
+    layout = {}
+    inner_points = concrete_data['coping']['xyz_inner']
     dia = 29
-    lines = []
-    for i in range(len(inner_points) - 1):
-        if i == 5:
-            continue
-
-        rebar = create_rebar(
-            rebar_scale,
-            start_point=inner_points[i, :],
-            end_point=inner_points[i+1, :],
-            r_outer=dia/2
-        )
-        lines.append(rebar)
-
-    add_rebar('coping_outer', dia, pv.merge(lines))
-
-
-    # ----------------------------------------------------
-    # 2) y 방향 리바
-    # ----------------------------------------------------
-    rebar_y = concrete_data['rebar_x']['']  # (개수, 간격, dia)
-    x_distance = 0
-    for c, spacing, dia_str in zip(rebar_y[0], rebar_y[1], rebar_y[3]):
-        if any(pd.isna(v) for v in (c, spacing, dia_str)):
-            break
-
-        dia = float(re.findall(r'\d+', dia_str)[0])
-        lines = []
-        for _ in range(int(c)):
-            x_distance += spacing
-            rebar = create_rebar(
-                rebar_scale,
-                start_point=(-length['x'] + x_distance, cover, length['z']),
-                end_point=(-length['x'] + x_distance, length['y'] - cover, length['z']),
-                r_outer=dia/2
-            )
-            lines.append(rebar)
-
-        add_rebar('coping_y', dia, pv.merge(lines))
-
-    # ----------------------------------------------------
-    # 3) x / z 방향 (xz 평면 리바)
-    #    - 원본 코드에서는 r_outer=25/2 고정
-    #    - 직경 25로 처리 → (x, 25.0), (z, 25.0)
-    # ----------------------------------------------------    
+    idx = np.delete(np.arange(len(inner_points) - 1), 5)
+    add_rebar(layout, 'coping_outer', dia, inner_points[idx, :], inner_points[idx+1, :])
+    copy_rebar(layout, 'coping_outer', coping_y_offsets(concrete_data))
+    return layout
+
+def coping_y_offsets(concrete_data):
+    # outer, x, z 리바를 y방향으로 복사하는 위치
+    y_distance = cumulative_distance(concrete_data['rebar_y'].valid_rows('count', 'spacing'))  # (개수, 간격) 정보
+    return np.column_stack([np.zeros_like(y_distance), y_distance, np.zeros_like(y_distance)])
+
+def layout_coping_y(concrete_data):
+    # y 방향 리바 → z방향 복사
+    layout = {}
+    length = concrete_data['length']
+    cover = concrete_data['coping_cover']['thickness']
+    rows = concrete_data['rebar_x'].valid_rows('count', 'spacing', 'dia2')  # (개수, 간격, dia)
+    x = -length['x'] + cumulative_distance(rows)
+    start = np.column_stack([x, np.full_like(x, cover), np.full_like(x, length['z'])])
+    end = np.column_stack([x, np.full_like(x, length['y'] - cover), np.full_like(x, length['z'])])
+    add_rebar_rows(layout, 'coping_y', np.repeat(rows['dia2'], rows['count'].astype(int)), start, end)
+
+    z_distance = cumulative_distance(concrete_data['rebar_z'].valid_rows('count', 'spacing', stop=2))
+    copy_rebar(layout, 'coping_y', np.column_stack([np.zeros_like(z_distance), np.zeros_like(z_distance), -z_distance]))
+    return layout
+
+def layout_coping_xz(concrete_data):
+    # x / z 방향 (xz 평면 리바) → y방향 복사
+    layout = {}
+    length = concrete_data['length']
+    cover = concrete_data['coping_cover']['thickness']
     for idx in range(2):
         r_type = 'coping_z' if idx == 0 else 'coping_x'
         if idx == 0:
-            data_r = concrete_data['rebar_x']['']
+            table = concrete_data['rebar_x']
             x0, x1 = -length['x'] + cover, 0
             z0, z1 = -99999, 99999
         else:
-            data_r = concrete_data['rebar_z']['']
+            table = concrete_data['rebar_z']
             x0, x1 = -99999, 99999
             z0, z1 = length['z'] - cover, 0
+        rows = table.valid_rows('count', 'spacing', start=1)
 
-        x_distance, z_distance = 0, 0        
-        for c, spacing, dia_str in zip(data_r[0][1:], data_r[1][1:], data_r[2][1:]):
-            if any(pd.isna(v) for v in (c, spacing)):
-                break
-
-            lines = []
-            dia = float(re.findall(r'\d+', dia_str)[0])
-            for _ in range(int(c)):
-                if idx == 0:
-                    x_distance += spacing
-                else:
-                    z_distance += spacing
-
-                line_p0 = np.array([x0 + x_distance, 0, z0 - z_distance], dtype=np.float32)
-                line_dir = np.array([x1, 0, z1], dtype=np.float32)
-                intersections = find2_point(concrete_data, line_p0, line_dir)
-                if len(intersections) == 2:
-                    rebar = create_rebar(
-                        rebar_scale,
-                        start_point=intersections[0],
-                        end_point=intersections[1],
-                        r_outer=dia/2  # 직경 25
-                    )
-                    lines.append(rebar)
-
-            add_rebar(r_type, dia, pv.merge(lines))
-
-    # ----------------------------------------------------
-    # 4) 복사(translate) 로직
-    #    - (a) outer, x, z, outer 리바를 y방향으로 복사
-    #        translate 후 병합 → 다시 같은 키((r_type, dia))로 덮어쓰기
-    #
-    #    - (b) y리바를 z방향으로 복사
-    #      → (y, dia) 메시에 대해 translate → 병합 → 다시 (y, dia)로 저장
-    # ----------------------------------------------------
-
-    # (a) outer / x / z → y방향 복사
-    rebar_y_data = concrete_data['rebar_y']['']  # (개수, 간격) 정보
-    for loop_type in ['coping_outer', 'coping_z', 'coping_x']:       # 세 종류를 각각 순회
-        for (r_type, dia) in list(rebar_dict.keys()):        
-            if r_type != loop_type:
-                continue
-
-            # merge 후 복사
-            base_merged = pv.merge(rebar_dict[(r_type, dia)])
-            rebar = []
-            y_distance = 0
-            for c, spacing in zip(rebar_y_data[0], rebar_y_data[1]):
-                if any(pd.isna(v) for v in (c, spacing)):
-                    break
-                for _ in range(int(c)):
-                    y_distance += spacing
-                    copied = base_merged.copy(deep=True)
-                    copied.translate((0, y_distance, 0), inplace=True)
-                    rebar.append(copied)
-            
-            rebar_dict[(r_type, dia)] = [pv.merge(rebar)]   # 기존 데이터 삭제 (여기서는 이게 맞음)
-            # add_rebar(r_type, dia, pv.merge(rebar))      # 기존 철근을 유지하면서 추가 (+=)
-
-
-    # (b) y 리바 → z방향 복사
-    rebar_z_data = concrete_data['rebar_z']['']
-    for (r_type, dia) in list(rebar_dict.keys()):        
-        if r_type != 'coping_y':            
-            continue
-
-        # merge 후 복사
-        base_merged = pv.merge(rebar_dict[(r_type, dia)])
-        rebar = []
-        z_distance = 0
-        for c, spacing in zip(rebar_z_data[0][:2], rebar_z_data[1][:2]):
-            if any(pd.isna(v) for v in (c, spacing)):
-                break
-            for _ in range(int(c)):
-                z_distance += spacing
-                copied = base_merged.copy(deep=True)
-                copied.translate((0, 0, -z_distance), inplace=True)
-                rebar.append(copied)
-
-        rebar_dict[(r_type, dia)] = [pv.merge(rebar)]
-
-
-    # ----------------------------------------------------
-    # 기둥 주철근 & 띠철근 & cross rebar
-    # ----------------------------------------------------
+        # 모든 철근의 직선을 한 번에 교차 계산 → (N, 2, 3)
+        distance = cumulative_distance(rows)
+        if idx == 0:
+            line_p0 = np.column_stack([x0 + distance, np.zeros_like(distance), np.full_like(distance, z0)])
+        else:
+            line_p0 = np.column_stack([np.full_like(distance, x0), np.zeros_like(distance), z0 - distance])
+        intersections = find2_points(concrete_data, line_p0, [x1, 0, z1])
+        found = ~np.isnan(intersections).any(axis=(1, 2))
+
+        dias = np.repeat(rows['dia'], rows['count'].astype(int))
+        for dia in dict.fromkeys(dias):
+            mask = found & (dias == dia)
+            add_rebar(layout, r_type, dia, intersections[mask, 0], intersections[mask, 1])
+
+    offsets = coping_y_offsets(concrete_data)
+    for loop_type in ['coping_z', 'coping_x']:
+        copy_rebar(layout, loop_type, offsets)
+    return layout
+
+def layout_column_rebar(concrete_data):
+    # 기둥 주철근 (바깥쪽, 안쪽 2단)
+    layout = {}
+    column = concrete_data['column']
     column_rebar = concrete_data['column_rebar']
-    column_cross = concrete_data['column_cross']
-    column_tie = concrete_data['column_tie']['']  # (개수, 간격, dia)
     footing = concrete_data['footing']
+    xc, yc = column_center(concrete_data)
+    diameter = column['diameter'] - column['cover'] * 2
     num_lines = column_rebar['num']
+
+    dia = column_rebar['dia']
+    radius = np.repeat([diameter/2, diameter/2 - dia], int(num_lines))   # 바깥쪽, 안쪽 2단
+    angle = np.tile(2 * np.pi * np.arange(int(num_lines)) / num_lines, 2)
+    x = radius * np.cos(angle) + xc
+    y = radius * np.sin(angle) + yc
+    start = np.column_stack([x, y, np.full_like(x, -column['height']/2 - footing['height'] + footing['cover_lower'])])
+    end   = np.column_stack([x, y, np.full_like(x, column['height']/2 + column_rebar['length_top'])])
+    add_rebar(layout, 'column_rebar', dia, start, end)
+    return layout
+
+def layout_column_cross(concrete_data):
+    # 기둥 cross rebar (높이마다 4개 각도)
+    layout = {}
+    column = concrete_data['column']
+    column_cross = concrete_data['column_cross']
     diameter = column['diameter'] - column['cover'] * 2
     height = column['height']
+    center_bottom = column_bottom(concrete_data)
 
-    outer_points = concrete_data['coping']['xyz']
-
-    xc = (outer_points[2][0] + outer_points[3][0]) / 2
-    center_top = (xc, length['y']/2, height/2 + column_rebar['length_top'])
-    center_bottom = (xc, length['y']/2, -height/2 - column_cross['length_bottom'])
-
-    ### 기둥 주철근
-    dia = column_rebar['dia']
-    for iter in range(2):
-        if iter == 0:
-            radius = diameter/2
-        else:
-            radius = diameter/2 - dia
-
-        lines = []
-        for i in range(int(num_lines)):
-            angle = 2 * np.pi * i / num_lines
-            x = radius * np.cos(angle) + xc
-            y = radius * np.sin(angle) + length['y']/2
-            start = (x, y, -column['height']/2 - footing['height'] + footing['cover_lower'])
-            end   = (x, y, column['height']/2 + column_rebar['length_top'])
-
-            rebar = create_rebar(rebar_scale, start_point=start, end_point=end, r_outer=dia/2)
-            lines.append(rebar)
-
-        if iter == 0:
-            column_rebar1 = pv.merge(lines)            
-        else:            
-            column_rebar2 = pv.merge(lines)            
-    
-    column_rebar = pv.merge([column_rebar1, column_rebar2])
-    add_rebar('column_rebar', dia, column_rebar)    
-
-    ### 기둥 cross rebar
-    lines = []
     angles_deg = [0, 45, 90, 135]
     dia = column_cross['dia']
-    for iter in range(20):
-        for deg in angles_deg:    
-            rad = np.radians(deg)  # 각도를 라디안으로 변환
-            z0 = column_cross['spacing'] * iter
-            if center_bottom[2] + z0 > height/2:
-                break
-            # 원의 경계 양쪽 점 계산
-            p1 = center_bottom + diameter/2 * np.array([np.cos(rad), np.sin(rad), 0]) + np.array([0, 0, z0])
-            p2 = center_bottom - diameter/2 * np.array([np.cos(rad), np.sin(rad), 0]) + np.array([0, 0, z0])
-
-            rebar = create_rebar(rebar_scale, start_point=p1, end_point=p2, r_outer=dia/2)
-            lines.append(rebar)
-        
-    add_rebar('column_cross', dia, pv.merge(lines))
-
-    ### 기둥 띠철근
-    z_distance = 0
-    for c, spacing, dia_str in zip(column_tie[0], column_tie[1], column_tie[2]):
-        if any(pd.isna(v) for v in (c, spacing, dia_str)):
-            break
-        
-        lines = []
-        dia = float(re.findall(r'\d+', dia_str)[0])
-        for _ in range(int(c)):
-            z_distance += spacing
-
-            profile = pv.Polygon(center=(diameter/2 + (22+25)/2, 0, 0), radius=dia/2,
-                        normal=(0, 1, 0), n_sides=30, fill=False)
-
-            # 띠철근 회전 (기둥 축을 기준으로 회전)
-            extruded = profile.extrude_rotate(resolution=40, rotation_axis=(0, 0, 1))
-            copied = extruded.copy(deep=True)
-            copied.translate((center_top[0], center_top[1], center_top[2] - z_distance), inplace=True)
-            lines.append(copied)
-
-        add_rebar('column_tie', dia, pv.merge(lines))
-
-    # ----------------------------------------------------
-    # 기초 철근
-    # ----------------------------------------------------
-    footing_top = concrete_data['footing_top']['']
-    footing_bottom = concrete_data['footing_bottom']['']
+    z0 = column_cross['spacing'] * np.arange(20)
+    z0 = z0[center_bottom[2] + z0 <= height/2]
+    rad = np.radians(angles_deg)  # 각도를 라디안으로 변환
+    # 원의 경계 양쪽 점 계산 (높이 z0 마다 4개 각도)
+    half = diameter/2 * np.column_stack([np.cos(rad), np.sin(rad), np.zeros_like(rad)])
+    shift = np.column_stack([np.zeros((len(z0), 2)), z0])
+    p1 = (np.array(center_bottom) + shift[:, None, :] + half[None, :, :]).reshape(-1, 3)
+    p2 = (np.array(center_bottom) + shift[:, None, :] - half[None, :, :]).reshape(-1, 3)
+    add_rebar(layout, 'column_cross', dia, p1, p2)
+    return layout
+
+def layout_column_tie(concrete_data):
+    # 기둥 띠철근 (원형 고리 중심 위치)
+    layout = {}
+    column = concrete_data['column']
+    column_tie = concrete_data['column_tie'].valid_rows('count', 'spacing', 'dia')  # (개수, 간격, dia)
+    diameter = column['diameter'] - column['cover'] * 2
+    xc, yc = column_center(concrete_data)
+    z_top = column['height']/2 + concrete_data['column_rebar']['length_top']
+
+    z = z_top - cumulative_distance(column_tie)
+    center = np.column_stack([np.full_like(z, xc), np.full_like(z, yc), z])
+    dias = np.repeat(column_tie['dia'], column_tie['count'].astype(int))
+    for dia in dict.fromkeys(dias):
+        # index : 전체 띠철근 중 순서 (나선 띠철근이 끊기는 곳 판단)
+        layout[('column_tie', dia)] = {'center': center[dias == dia], 'radius': diameter/2 + (22+25)/2,
+                                       'index': np.flatnonzero(dias == dia)}
+    return layout
+
+def layout_footing_grid(concrete_data, r_type):
+    # 기초 상부 / 하부 철근 (x, y 방향 번갈아 배치) → z방향 복사
+    layout = {}
     footing = concrete_data['footing']
-    # st.write(footing)
+    height = concrete_data['column']['height']
+    center_bottom = column_bottom(concrete_data)
+    footing_rebar = concrete_data[r_type].valid_rows('count', 'spacing', 'dia')
+    z0 = -height/2 if r_type == 'footing_top' else -height/2 - footing['height']
+
+    # 표 (개수, 간격, 직경) → 철근 1개마다 누적 거리 / 직경 (행 반복문 없이 repeat / cumsum)
+    distance = cumulative_distance(footing_rebar)
+    dias = np.repeat(footing_rebar['dia'], footing_rebar['count'].astype(int))
+    n = len(distance)
+    x_lo, x_hi = center_bottom[0] - footing['length_x']/2, center_bottom[0] + footing['length_x']/2
+    y_lo, y_hi = center_bottom[1] - footing['length_y']/2, center_bottom[1] + footing['length_y']/2
+    # x방향 철근 (y = d), y방향 철근 (x = d) 을 번갈아 배치 : (n, 2방향, 3) → (2n, 3)
+    start = np.empty((n, 2, 3))
+    end = np.empty((n, 2, 3))
+    start[:, 0] = np.column_stack([np.full(n, x_lo + footing['cover_xy']), y_lo + distance, np.full(n, z0)])
+    end[:, 0] = np.column_stack([np.full(n, x_hi - footing['cover_xy']), y_lo + distance, np.full(n, z0)])
+    start[:, 1] = np.column_stack([x_lo + distance, np.full(n, y_lo + footing['cover_xy']), np.full(n, z0)])
+    end[:, 1] = np.column_stack([x_lo + distance, np.full(n, y_hi - footing['cover_xy']), np.full(n, z0)])
+    add_rebar_rows(layout, r_type, np.repeat(dias, 2), start.reshape(-1, 3), end.reshape(-1, 3))
 
-    for iter in range(2):
-        if iter == 0:
-            footing_rebar = footing_top
-        else:
-            footing_rebar = footing_bottom
-        
-        xy_distance = 0
-        for c, spacing, dia_str in zip(footing_rebar[0], footing_rebar[1], footing_rebar[2]):
-            if any(pd.isna(v) for v in (c, spacing, dia_str)):
-                break
-
-            lines = []
-            dia = float(re.findall(r'\d+', dia_str)[0])
-            if iter == 0:
-                z0 = -height/2
-            else:
-                z0 = -height/2 - footing['height']
-
-            for _ in range(int(c)):
-                xy_distance += spacing
-                for i in range(2):                
-                    if i == 0:
-                        x0 = center_bottom[0] - footing['length_x']/2 + footing['cover_xy']
-                        x1 = center_bottom[0] + footing['length_x']/2 - footing['cover_xy']
-                        y0 = center_bottom[1] - footing['length_y']/2 + xy_distance
-                        y1 = y0
-                    else:
-                        x0 = center_bottom[0] - footing['length_x']/2 + xy_distance
-                        x1 = x0
-                        y0 = center_bottom[1] - footing['length_y']/2 + footing['cover_xy']
-                        y1 = center_bottom[1] + footing['length_y']/2 - footing['cover_xy']
-
-                    rebar = create_rebar(
-                        rebar_scale,
-                        start_point=(x0, y0, z0),
-                        end_point=(x1, y1, z0),
-                        r_outer=dia/2
-                    )
-                    lines.append(rebar)
-
-            if iter == 0:
-                add_rebar('footing_top', dia, pv.merge(lines))
-            else:
-                add_rebar('footing_bottom', dia, pv.merge(lines))
-
-
-    # ----------------------------------------------------
     ### 복사
-    footing_v = np.array(list(concrete_data['footing_ver'].values()))
-    for (r_type, dia) in list(rebar_dict.keys()):        
-        if r_type != 'footing_top':            
-            continue
-
-        base_merged = pv.merge(rebar_dict[(r_type, dia)])
-        rebar = []
-        z_distance = 0
-        for iter in range(3):
-            spacing = footing_v[iter]
-            z_distance += spacing
-            copied = base_merged.copy(deep=True)
-            copied.translate((0, 0, -z_distance), inplace=True)
-            rebar.append(copied)
-
-        rebar_dict[(r_type, dia)] = [pv.merge(rebar)]
+    footing_v = np.array(list(concrete_data['footing_ver'].values()), dtype=float)
+    if r_type == 'footing_top':
+        z_distance = np.cumsum(footing_v[:3])        # 상부 철근 3단 (아래로)
+        copy_rebar(layout, r_type, np.column_stack([np.zeros((3, 2)), -z_distance]))
+    else:
+        z_distance = np.cumsum(footing_v[::-1][:2])  # 하부 철근 2단 (위로)
+        copy_rebar(layout, r_type, np.column_stack([np.zeros((2, 2)), z_distance]))
+    return layout
+
+def layout_footing_ver(concrete_data):
+    # 기초 수직철근 → x방향 복사
+    layout = {}
+    footing = concrete_data['footing']
+    height = concrete_data['column']['height']
+    center_bottom = column_bottom(concrete_data)
+    footing_top = concrete_data['footing_top'].valid_rows('count', 'spacing', 'dia')
 
-    for (r_type, dia) in list(rebar_dict.keys()):        
-        if r_type != 'footing_bottom':            
+    z0 = -height/2 - footing['cover_upper']
+    z1 = -height/2 + footing['cover_lower'] - footing['height']
+    dia = footing['ver_dia']
+    y0 = center_bottom[1] - footing['length_y']/2 + cumulative_distance(footing_top)
+    x0 = np.full_like(y0, center_bottom[0] - footing['length_x']/2) #+ footing['cover_xy']
+    start = np.column_stack([x0, y0, np.full_like(y0, z0)])
+    end = np.column_stack([x0, y0, np.full_like(y0, z1)])
+    if len(y0):
+        add_rebar(layout, 'footing_ver', dia, start, end)
+
+    # 복사
+    x_distance = cumulative_distance(concrete_data['footing_top'].valid_rows('count', 'spacing'))
+    copy_rebar(layout, 'footing_ver', np.column_stack([x_distance, np.zeros((len(x_distance), 2))]))
+    return layout
+
+
+# 철근 그룹 → (배치 함수, 입력 구역)  : 입력 구역이 바뀐 그룹만 다시 생성
+# 기둥 중심(column_center)은 coping, length 에서, center_bottom 은 column, column_cross 에서 계산
+COLUMN_BASE = ('length', 'coping', 'column')
+REBAR_GROUPS = {
+    'coping_outer': (layout_coping_outer, ('coping', 'rebar_y')),
+    'coping_y': (layout_coping_y, ('length', 'coping_cover', 'rebar_x', 'rebar_z')),
+    'coping_xz': (layout_coping_xz, ('length', 'coping', 'coping_cover', 'rebar_x', 'rebar_y', 'rebar_z')),
+    'column_rebar': (layout_column_rebar, COLUMN_BASE + ('column_rebar', 'footing')),
+    'column_cross': (layout_column_cross, COLUMN_BASE + ('column_cross',)),
+    'column_tie': (layout_column_tie, COLUMN_BASE + ('column_rebar', 'column_tie')),
+    'footing_top': (partial(layout_footing_grid, r_type='footing_top'), COLUMN_BASE + ('column_cross', 'footing', 'footing_top', 'footing_ver')),
+    'footing_bottom': (partial(layout_footing_grid, r_type='footing_bottom'), COLUMN_BASE + ('column_cross', 'footing', 'footing_bottom', 'footing_ver')),
+    'footing_ver': (layout_footing_ver, COLUMN_BASE + ('column_cross', 'footing', 'footing_top')),
+}
+
+def affected_groups(sections):
+    """ 바뀐 입력 구역 목록 → 다시 생성해야 하는 철근 그룹 목록 """
+    sections = set(sections)
+    return [name for name, (_, inputs) in REBAR_GROUPS.items() if sections.intersection(inputs)]
+
+def group_digest(name, digests):
+    """ 그룹 입력 구역들의 해시 (digests = CopingModel.section_digests()) """
+    return '-'.join(digests[section] for section in REBAR_GROUPS[name][1])
+
+@profiled('rebar_layout')
+def rebar_layout(concrete_data, groups=None):
+    """ 철근 배치 좌표만 계산 (메시 생성 없음) → {(종류, 직경): 배치}
+    직선 철근 : {'start': (N, 3), 'end': (N, 3), 'offsets': (M, 3) 또는 None (복사 위치)}
+    띠철근    : {'center': (N, 3), 'radius': 회전 반경}
+    groups : 일부 그룹만 (REBAR_GROUPS 의 이름 목록, 기본 전체)  """
+    layout = {}  # (종류, 직경)을 key로 하는 딕셔너리
+    for name in groups or REBAR_GROUPS:
+        layout.update(REBAR_GROUPS[name][0](concrete_data))
+    return layout
+
+
+def tie_hoop(dia, radius, n_sides=30, resolution=40):
+    """ 띠철근 원형 고리 1개 (원점 중심, 회전 반경 radius)
+    n_sides: 단면 분할 수, resolution: 원주 방향 분할 수 (n_sides=0 이면 선으로 표시)  """
+    if n_sides > 0:
+        profile = pv.Polygon(center=(radius, 0, 0), radius=dia/2, normal=(0, 1, 0), n_sides=n_sides, fill=False)
+        # 띠철근 회전 (기둥 축을 기준으로 회전) → 이음매 중복 점 병합 (회전 오차가 있어 허용 오차 지정)
+        return profile.extrude_rotate(resolution=resolution, rotation_axis=(0, 0, 1)).clean(tolerance=1e-6, absolute=True)
+    theta = 2 * np.pi * np.arange(resolution) / resolution
+    ring = np.column_stack([radius * np.cos(theta), radius * np.sin(theta), np.zeros_like(theta)])
+    return pv.lines_from_points(ring, close=True)
+
+
+def tie_mesh(dia, ties, n_sides=30, resolution=40, instanced=False):
+    """ 띠철근 원형 고리 메시 (ties = {'center': (N, 3), 'radius': R})
+    고리는 직경마다 1개만 만들고 center 위치마다 복사 (replicate_mesh, 고리 순서 = center 순서)  """
+    if len(ties['center']) == 0:
+        return pv.PolyData()
+    return replicate_mesh(tie_hoop(dia, ties['radius'], n_sides, resolution), ties['center'], instanced=instanced)
+
+
+def spiral_mesh(dia, ties, n_sides=30, resolution=40):
+    """ 나선 띠철근 : 고리 중심을 1바퀴에 하나씩 지나는 나선 (간격 = 표의 간격) 을 따라 튜브 1개
+    같은 직경의 띠철근이 끊긴 곳 (ties['index'] 가 연속이 아닌 곳) 에서 나선을 나눔, 1개뿐인 구간은 고리
+    resolution: 1바퀴 분할 수 (n_sides=0 이면 선으로 표시)  """
+    center, radius = ties['center'], ties['radius']
+    resolution = max(int(resolution), 3)   # 0 이면 turn 계산이 0 으로 나누기
+    index = ties.get('index', np.arange(len(center)))
+    pieces = []
+    for run in np.split(np.arange(len(center)), np.flatnonzero(np.diff(index) > 1) + 1):
+        c = center[run]
+        if len(c) < 2:
+            pieces.append(tie_mesh(dia, {'center': c, 'radius': radius}, n_sides, resolution))
             continue
+        turn = np.arange((len(c) - 1) * resolution + 1) / resolution   # 고리 번호 (1바퀴 = 1)
+        k = np.minimum(turn.astype(int), len(c) - 2)
+        axis = c[k] + (c[k+1] - c[k]) * (turn - k)[:, None]             # 고리 중심 사이 선형 보간
+        theta = 2 * np.pi * turn
+        points = axis + radius * np.column_stack([np.cos(theta), np.sin(theta), np.zeros_like(theta)])
+        helix = pv.PolyData(points, lines=np.hstack([[len(points)], np.arange(len(points))]))   # 폴리라인 1개 → 튜브 1개
+        pieces.append(helix.tube(radius=dia/2, n_sides=n_sides, capping=True) if n_sides > 0 else helix)
+    pieces = [piece for piece in pieces if piece.n_points]
+    if not pieces:
+        return pv.PolyData()
+    return pieces[0].append_polydata(*pieces[1:]) if len(pieces) > 1 else pieces[0]
+
+
+def rebar_lod(layout, rebar_scale, triangle_budget, window_px=1600, zoom=10, px_per_side=3, min_sides=3, max_sides=20):
+    """ 자동 LOD : (종류, 직경) 그룹별 단면 분할 수 결정 → {key: n_sides}  (0이면 선으로 표시)
+    - 화면상 철근 굵기(px)로 분할 수 결정 : 모델 전체가 window_px 에 들어온 상태에서 zoom 배 확대 기준
+    - 모델 전체 화면에서 0.5 px 미만인 그룹(멀거나 가는 철근)은 선
+    - 전체 삼각형 수가 triangle_budget 을 넘으면 삼각형이 가장 많은 그룹부터 분할 수를 줄이고,
+      min_sides 에서도 넘으면 그 그룹을 선으로 표시  """
+    points = [bars['center'] if 'center' in bars else np.vstack([bars['start'], bars['end']]) for bars in layout.values()]
+    points = np.vstack(points) if points else np.zeros((0, 3))
+    extent = np.linalg.norm(np.ptp(points, axis=0)) if len(points) else 1.
+
+    n_bars, sides = {}, {}
+    for key, bars in layout.items():
+        r_type, dia = key
+        if 'center' in bars:  # 띠철근은 rebar_scale 과 관계없이 실제 직경
+            n_bars[key] = len(bars['center'])
+            pixel = dia / extent * window_px
+        else:
+            n_copy = 1 if bars['offsets'] is None else len(bars['offsets'])
+            n_bars[key] = len(bars['start']) * n_copy
+            pixel = dia * rebar_scale / extent * window_px
+        sides[key] = 0 if pixel < 0.5 else int(np.clip(round(np.pi * pixel * zoom / px_per_side), min_sides, max_sides))
+
+    def triangles(key, n):
+        if n == 0:
+            return 0
+        if 'center' in layout[key]:
+            return n_bars[key] * n * (2*n) * 2   # 단면 n × 원주 2n 사각형
+        return n_bars[key] * (4*n - 4)          # 측면 2n + 캡 2(n-2)
+
+    while sum(triangles(key, n) for key, n in sides.items()) > triangle_budget:
+        key = max(sides, key=lambda k: triangles(k, sides[k]))
+        if sides[key] == 0:
+            break
+        sides[key] = 0 if sides[key] <= min_sides else max(min_sides, int(sides[key] * 0.8))
+    return sides
 
-        base_merged = pv.merge(rebar_dict[(r_type, dia)])
-        rebar = []
-        z_distance = 0
-        for iter in range(2):
-            spacing = footing_v[-iter-1]
-            z_distance += spacing
-
-            copied = base_merged.copy(deep=True)
-            copied.translate((0, 0, z_distance), inplace=True)
-            rebar.append(copied)
 
-        rebar_dict[(r_type, dia)] = [pv.merge(rebar)]
+def group_mesh(layout, rebar_scale, instanced=False, lod=None, spiral=False):
+    """ 배치 (rebar_layout 결과) → {(종류, 직경): 메시}
+    spiral=True 이면 띠철근을 나선 1개 (spiral_mesh) 로 표시  """
+    lod = lod or {}
+    rebar = {}
+    for (r_type, dia), bars in layout.items():
+        if 'center' in bars:
+            n_sides = lod.get((r_type, dia), 30)
+            resolution = 2*n_sides if lod and n_sides > 0 else 40   # 선으로 표시 (n_sides=0) 할 때도 원주 분할 수는 유지
+            with span(f'rebar {r_type} {int(dia)}', n_bars=len(bars['center'])) as info:
+                if spiral:
+                    rebar[(r_type, dia)] = spiral_mesh(dia, bars, n_sides=n_sides, resolution=resolution)
+                else:
+                    rebar[(r_type, dia)] = tie_mesh(dia, bars, n_sides=n_sides, resolution=resolution, instanced=instanced)
+                info['n_points'] = rebar[(r_type, dia)].n_points
+            continue
 
+        n_sides = lod.get((r_type, dia), 20)
+        scale = rebar_scale if n_sides > 0 else 0
+        with span(f'rebar {r_type} {int(dia)}', n_bars=len(bars['start'])) as info:
+            mesh = create_rebars(scale, bars['start'], bars['end'], r_outer=dia/2, n_sides=max(n_sides, 3))
+            info['n_points'] = mesh.n_points
+        if bars['offsets'] is not None:
+            with span(f'copy {r_type} {int(dia)}', n_copies=len(bars['offsets'])) as info:
+                mesh = replicate_mesh(mesh, bars['offsets'], instanced=instanced)
+                info['n_points'] = mesh.n_points
+        rebar[(r_type, dia)] = mesh
+    return rebar
 
-    ### 기둥 수직철근    
-    z0 = -height/2 - footing['cover_upper']
-    z1 = -height/2 + footing['cover_lower'] - footing['height']
-    xy_distance = 0
-    for c, spacing, dia_str in zip(footing_top[0], footing_top[1], footing_top[2]):
-        if any(pd.isna(v) for v in (c, spacing, dia_str)):
-            break
 
-        lines = []
-        dia = footing['ver_dia']
-        for _ in range(int(c)):
-            xy_distance += spacing
-            x0 = center_bottom[0] - footing['length_x']/2 #+ footing['cover_xy']
-            y0 = center_bottom[1] - footing['length_y']/2 + xy_distance
-
-            rebar = create_rebar(
-                rebar_scale,
-                start_point=(x0, y0, z0),
-                end_point=(x0, y0, z1),
-                r_outer=dia/2
-            )
-            lines.append(rebar)
-
-        add_rebar('footing_ver', dia, pv.merge(lines))
-    
-    # 복사    
-    for (r_type, dia) in list(rebar_dict.keys()):        
-        if r_type != 'footing_ver':            
-            continue
+REBAR_POOLS = {}   # (executor, workers) → 실행기 (여러 세션이 공유)
+REBAR_POOLS_LOCK = threading.Lock()
+
+def rebar_pool(executor, workers=None):
+    """ 철근 생성 실행기 (executor, workers 조합마다 1개 만들어 재사용) """
+    key = (executor, workers)
+    with REBAR_POOLS_LOCK:
+        if key in REBAR_POOLS:
+            return REBAR_POOLS[key]
+        if executor == 'thread':
+            REBAR_POOLS[key] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rebar')
+        elif executor == 'process':
+            # 서버 (여러 스레드) 프로세스를 fork 하지 않도록 spawn
+            REBAR_POOLS[key] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        else:
+            raise ValueError(f"executor 는 None, 'thread', 'process' 중 하나: {executor}")
+        return REBAR_POOLS[key]
+
+def shutdown_rebar_pools():
+    """ 실행기 모두 종료 (multiprocessing 작업 프로세스 안에서 process 실행기를 썼다면
+    끝나기 전에 호출해야 함 : 종료 시 자식 프로세스를 기다리므로)  """
+    with REBAR_POOLS_LOCK:
+        for pool in REBAR_POOLS.values():
+            pool.shutdown()
+        REBAR_POOLS.clear()
+
+
+def build_groups(jobs, rebar_scale, instanced=False, executor=None, workers=None, spiral=False):
+    """ {그룹 이름: (배치, lod)} → {그룹 이름: {(종류, 직경): 메시}}
+    executor : None 이면 순서대로, 'thread' / 'process' 이면 (종류, 직경) 단위로 나눠 동시에 생성
+      thread  : NumPy / VTK 연산이 GIL 을 놓는 동안 겹쳐 실행 (메시 복사 없음, 측정 구간도 기록)
+      process : 작업 프로세스에서 생성한 메시를 pickle 로 받음 (GIL 무관, 전송 비용 있음)
+    결과 (그룹, 키 순서 포함) 는 순서대로 실행한 것과 같음  """
+    if executor is None:
+        return {name: group_mesh(layout, rebar_scale, instanced, lod, spiral) for name, (layout, lod) in jobs.items()}
+
+    pool = rebar_pool(executor, workers)
+    profiler = current_profiler() if executor == 'thread' else None
+    depth = profiler.depths.get(threading.get_ident(), 0) if profiler is not None else 0
+    tasks = [(name, key, bars, lod) for name, (layout, lod) in jobs.items() for key, bars in layout.items()]
+    futures = {}
+    for name, key, bars, lod in tasks:
+        args = ({key: bars}, rebar_scale, instanced, {key: lod[key]} if key in lod else {}, spiral)
+        if executor == 'thread':
+            futures[(name, key)] = pool.submit(call_with_profiler, profiler, depth, group_mesh, *args)
+        else:
+            futures[(name, key)] = pool.submit(group_mesh, *args)
+    return {name: {key: futures[(name, key)].result()[key] for key in layout} for name, (layout, _) in jobs.items()}
+
+
+@profiled('coping_rebar')
+def coping_rebar(rebar_scale, concrete_data, instanced=False, triangle_budget=None, cache=None, executor=None, workers=None,
+                 spiral=False):
+    """ 철근 메시 생성 → {(종류, 직경): PolyData}
+    instanced=True 이면 복사된 그룹은 RebarInstances (형상 1개 + 복사 위치) 로 반환
+    triangle_budget 을 주면 자동 LOD (rebar_lod) 로 그룹별 분할 수 / 선 표시 결정
+    cache (GeometryCache : get / put / get_or_create / claim / release) 를 주면 REBAR_GROUPS 그룹별로 저장
+      → key 에 그룹 입력 구역의 해시가 들어가므로 입력이 바뀐 그룹만 다시 생성
+      → 다른 세션 (또는 warm_up) 이 만드는 중인 그룹은 다시 만들지 않고 끝날 때까지 기다림
+    executor ('thread' / 'process', workers : 개수) 를 주면 캐시에 없는 그룹을 동시에 생성 (build_groups)
+    spiral=True 이면 띠철근을 표의 간격을 피치로 하는 나선으로 표시  """
+    digests = concrete_data.section_digests() if cache is not None else None
+    def cache_key(key):
+        return (key[0], key[1], group_digest(key[1], digests), *key[2:])
+    def cached(key, create):
+        return create() if cache is None else cache.get_or_create(cache_key(key), create)
+
+    layouts = {name: cached(('rebar_layout', name), partial(rebar_layout, concrete_data, [name])) for name in REBAR_GROUPS}
+    lod = {}
+    if triangle_budget and rebar_scale > 0:   # LOD 는 전체 삼각형 수 기준이므로 모든 그룹의 배치로 결정
+        lod = rebar_lod({key: bars for layout in layouts.values() for key, bars in layout.items()}, rebar_scale, triangle_budget)
+
+    keys, jobs, groups, claimed = {}, {}, {}, {}
+    missing = object()
+    for name, layout in layouts.items():
+        group_lod = {key: lod[key] for key in layout if key in lod}
+        keys[name] = ('rebar_group', name, rebar_scale, instanced, tuple(sorted(group_lod.items())), spiral)
+        groups[name] = missing if cache is None else cache.get(cache_key(keys[name]), missing)
+        if groups[name] is missing:
+            # 캐시가 있으면 이 호출이 만들 그룹만 생성 중으로 표시 (나머지는 다른 세션이 만드는 중)
+            claimed[name] = None if cache is None else cache.claim(cache_key(keys[name]))
+            if cache is None or claimed[name] is not None:
+                jobs[name] = (layout, group_lod)
+
+    try:
+        for name, group in build_groups(jobs, rebar_scale, instanced, executor, workers, spiral).items():
+            groups[name] = group if cache is None else cache.put(cache_key(keys[name]), group)
+    finally:
+        for name, building in claimed.items():
+            if building is not None:
+                cache.release(cache_key(keys[name]), building)
+
+    # 다른 세션이 만드는 중이던 그룹 : 끝날 때까지 기다렸다가 사용 (그쪽이 실패했으면 여기서 생성)
+    for name in [name for name, group in groups.items() if group is missing]:
+        group_lod = {key: lod[key] for key in layouts[name] if key in lod}
+        groups[name] = cache.get_or_create(cache_key(keys[name]), lambda: build_groups(
+            {name: (layouts[name], group_lod)}, rebar_scale, instanced, spiral=spiral)[name])
 
-        # merge 후 복사
-        base_merged = pv.merge(rebar_dict[(r_type, dia)])
-        rebar = []
-        x_distance = 0
-        for c, spacing in zip(footing_top[0], footing_top[1]):
-            if any(pd.isna(v) for v in (c, spacing)):
-                break
-            for _ in range(int(c)):
-                x_distance += spacing
-                copied = base_merged.copy(deep=True)
-                copied.translate((x_distance, 0, 0), inplace=True)
-                rebar.append(copied)
-
-        rebar_dict[(r_type, dia)] = [pv.merge(rebar)]
-
-    # 5) 최종 Merge (key별로 [mesh1, mesh2, ...] → 하나로)
-    # ----------------------------------------------------
     rebar = {}
-    for key, mesh_list in rebar_dict.items():
-        rebar[key] = pv.merge(mesh_list)
-
+    for group in groups.values():
+        rebar.update(group)
     return rebar
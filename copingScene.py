@@ -0,0 +1,94 @@
+import numpy as np
+import pyvista as pv
+from copingBasic import add_rebar_mesh
+
+# actor 를 다시 만들지 않고 바로 바꿀 수 있는 표시 속성 (나머지 add_mesh 인자는 처음 만들 때만 사용)
+PROP_KEYS = ('color', 'opacity', 'line_width', 'point_size', 'render_points_as_spheres')
+
+
+class Scene:
+    """ 이름 붙은 actor 를 세션 동안 유지하는 장면 (plotter.clear() + add_mesh 를 매번 하지 않음)
+    begin() → show(이름, mesh, matrices, ...) 여러 번 → end()
+      같은 mesh    : 표시 속성 (색, 투명도, 선 두께 등) 만 바로 변경
+      mesh 변경    : mapper 입력만 교체 (인스턴싱 철근은 actor 다시 생성)
+      show 안 한 이름 : renderer 에서 떼어냄 (actor 는 유지 → 다시 보일 때 add_actor 만)
+                      max_idle 번 연속으로 show 하지 않으면 삭제 (입력 파일이 바뀐 이전 모델 등)
+    숨긴 actor 를 visibility 만 끄지 않고 떼어내는 이유 : stpyvista 가 renderer 의 actor 를 모두 전송  """
+
+    def __init__(self, plotter, max_idle=16):
+        self.plotter = plotter
+        self.max_idle = max_idle
+        self.frame = 0      # begin() 횟수
+        self.items = {}     # 이름 → {'mesh', 'props', 'base': [actor], 'copies': [[actor, ...] (배치 행렬마다)], 'frame'}
+        self.shown = set()  # 이번 장면에 보이는 actor (id)
+        self.created = 0    # 새로 만든 actor 수 (프로파일 / 확인용)
+
+    def begin(self):
+        self.shown = set()
+        self.frame += 1
+
+    def show(self, name, mesh, matrices=None, **kwargs):
+        """ mesh 를 matrices (4×4 변환 행렬 목록) 위치마다 표시 (place_mesh 와 같은 배치) """
+        props = {key: kwargs[key] for key in PROP_KEYS if key in kwargs}
+        item = self.items.get(name)
+        if item is not None and item['mesh'] is not mesh:
+            if isinstance(mesh, pv.DataSet) and isinstance(item['mesh'], pv.DataSet):
+                item['base'][0].mapper.dataset = mesh   # 복사 actor 는 mapper 를 공유
+                item['mesh'] = mesh
+            else:
+                self.remove(name)
+                item = None
+        if item is None:
+            base = add_rebar_mesh(self.plotter, mesh, **kwargs)
+            base = base if isinstance(base, list) else [base]
+            item = self.items[name] = {'mesh': mesh, 'props': props, 'base': base, 'copies': [base]}
+            self.created += len(base)
+        elif item['base']:
+            prop = item['base'][0].prop   # 복사 actor 는 prop 도 공유
+            for key, value in props.items():
+                if item['props'].get(key) != value:
+                    setattr(prop, key, value)
+            item['props'] = props
+
+        matrices = np.eye(4)[None] if matrices is None else matrices
+        while len(item['copies']) < len(matrices):
+            copies = []
+            for actor in item['base']:
+                instance = pv.Actor(mapper=actor.mapper, prop=actor.prop)
+                instance.position = actor.position   # 인스턴싱 철근의 복사 위치 → 교각 변환은 그 다음에 적용
+                copies.append(instance)
+            item['copies'].append(copies)
+            self.created += len(copies)
+        item['frame'] = self.frame
+        for matrix, copies in zip(matrices, item['copies']):
+            for actor in copies:
+                actor.user_matrix = matrix
+                self.attach(actor)
+        return [actor for copies in item['copies'][:len(matrices)] for actor in copies]
+
+    def attach(self, actor):
+        self.shown.add(id(actor))
+        if not self.plotter.renderer.HasViewProp(actor):
+            self.plotter.add_actor(actor, reset_camera=False)
+
+    def end(self):
+        """ 이번 장면에서 show 하지 않은 actor 는 renderer 에서 떼어냄 """
+        for name in [name for name, item in self.items.items() if self.frame - item['frame'] > self.max_idle]:
+            self.remove(name)
+        for item in self.items.values():
+            for copies in item['copies']:
+                for actor in copies:
+                    if id(actor) not in self.shown and self.plotter.renderer.HasViewProp(actor):
+                        self.plotter.remove_actor(actor, reset_camera=False, render=False)
+
+    def remove(self, name):
+        item = self.items.pop(name, None)
+        if item is None:
+            return
+        for copies in item['copies']:
+            for actor in copies:
+                self.shown.discard(id(actor))
+                self.plotter.remove_actor(actor, reset_camera=False, render=False)
+
+    def n_actors(self):
+        return len(self.shown)
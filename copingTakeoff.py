@@ -0,0 +1,45 @@
+import io
+import numpy as np
+import pandas as pd
+from copingRebar import rebar_layout
+
+STEEL_DENSITY = 7.85e-6   # 철근 단위질량 [kg/mm³] (7850 kg/m³)
+
+
+def rebar_takeoff(concrete_data):
+    """ 철근 물량 산출 (메시 생성 없이 rebar_layout 좌표에서 직접 계산) → DataFrame
+    (종류, 직경)별 개수, 총 길이 [m], 단위중량 [kg/m], 중량 [kg]  (단면적은 공칭 직경 기준 π·d²/4)  """
+    rows = []
+    for (r_type, dia), bars in rebar_layout(concrete_data).items():
+        if 'center' in bars:  # 띠철근 : 원형 고리 1개 = 2πR
+            bar_length = np.full(len(bars['center']), 2 * np.pi * bars['radius'])
+            n_copy = 1
+        else:
+            bar_length = np.linalg.norm(bars['end'] - bars['start'], axis=1)
+            bar_length = bar_length[bar_length > 0]
+            n_copy = 1 if bars['offsets'] is None else len(bars['offsets'])
+
+        unit_weight = np.pi * dia**2 / 4 * STEEL_DENSITY * 1000   # kg/m
+        total_length = bar_length.sum() * n_copy / 1000          # m
+        rows.append({'type': r_type, 'dia': int(dia), 'count': len(bar_length) * n_copy,
+                     'length_m': total_length, 'unit_weight_kg_m': unit_weight, 'mass_kg': total_length * unit_weight})
+
+    takeoff = pd.DataFrame(rows, columns=['type', 'dia', 'count', 'length_m', 'unit_weight_kg_m', 'mass_kg'])
+    # 같은 (종류, 직경)이 여러 번 나오는 경우 합산
+    takeoff = takeoff.groupby(['type', 'dia'], as_index=False, sort=True).agg(
+        {'count': 'sum', 'length_m': 'sum', 'unit_weight_kg_m': 'first', 'mass_kg': 'sum'})
+    return takeoff
+
+
+def takeoff_csv(takeoff):
+    # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+    return takeoff.to_csv(index=False).encode('utf-8-sig')
+
+
+def takeoff_xlsx(takeoff):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        takeoff.to_excel(writer, sheet_name='rebar_takeoff', index=False)
+        takeoff.groupby('dia', as_index=False)[['count', 'length_m', 'mass_kg']].sum().to_excel(
+            writer, sheet_name='by_dia', index=False)
+    return buffer.getvalue()
@@ -0,0 +1,273 @@
+"""
+브라우저 (WebGL) 뷰어 : 볼륨 / 외곽선 / 철근 그룹을 GLB (int16 좌표, 반복 배치는 GPU 인스턴싱) 로 한 번 보내고
+부위 / 철근 타입 / 직경 필터, 대칭, 카메라, 투명도, 직교 / 원근 투영은 브라우저에서 바로 변경 (서버 다시 그리기 없음)
+
+  html = viewer_html(viewer_glb(designs))   → st.components.v1.html(html, height=...)
+  HTML 에는 GLB 만 담음 (사이드바 값을 넣지 않음) → 모델이 같으면 HTML 이 같아 Streamlit 이 다시 보내거나 iframe 을 다시 불러오지 않음
+  처음 상태는 기본값, 도구 막대에서 바꾼 값은 sessionStorage 에 저장 (모델이 바뀌어 iframe 을 다시 불러와도 유지)
+
+GLB 노드 extras : {'kind': 'volume' | 'lines' | 'rebar' | 'mark', 'part', 'type', 'dia', 'types', 'mirror'}
+three.js 는 CDN (jsdelivr) 에서 불러옴
+"""
+import base64
+import json
+import pyvista as pv
+from copingBasic import mirror_matrices, color_map
+from copingExport import glb_bytes
+from copingProfile import profiled
+
+THREE_VERSION = '0.160.0'
+PARTS = {'all': '전체', 'coping': '코핑', 'column': '기둥', 'footing': '기초'}
+
+
+def table_marks(table, name, color, type_columns):
+    """ 간섭 / 피복 결과표 → 표시할 점 목록 [(이름, 점 (n, 3), 색상, 관련 철근 타입 목록), ...] (타입 조합별) """
+    if table is None or len(table) == 0:
+        return []
+    marks = []
+    for types, rows in table.groupby(list(type_columns)):
+        types = sorted(set(types if isinstance(types, tuple) else (types,)))
+        marks.append((name, rows[['x', 'y', 'z']].to_numpy(float), color, types))
+    return marks
+
+
+@profiled('viewer_glb')
+def viewer_glb(designs, marks=None):
+    """ 설계 목록 (coping.py 의 designs) → 뷰어용 GLB (bytes)
+    교각 배치와 대칭 (x = 0 반사) 은 노드 행렬 : 형상은 설계별 1벌만 저장
+    marks : {설계 digest: table_marks 목록}  """
+    marks = marks or {}
+    items = []
+    for design in designs:
+        placed = mirror_matrices(design['matrices'])
+        n_original = len(placed) // 2
+        mark_meshes = [(name, pv.PolyData(points), color, types) for name, points, color, types in marks.get(design['digest'], [])]
+        for k, matrix in enumerate(placed):
+            mirror = k >= n_original
+            for key in design['volumes'].keys():   # 'Coping Volume' → coping
+                part = key.split()[0].lower()
+                items.append((f'volume_{part}', design['volumes'][key], 'gray', 1.0,
+                              {'kind': 'volume', 'part': part, 'mirror': mirror}, matrix))
+            for key in design['lines'].keys():
+                part = key.split()[0].lower()
+                items.append((f'lines_{part}', design['lines'][key], 'blue', 1.0,
+                              {'kind': 'lines', 'part': part, 'mirror': mirror}, matrix))
+            for (r_type, dia), mesh in design['rebar'].items():
+                items.append((f'rebar_{r_type}_{int(dia)}', mesh, color_map.get(r_type, 'green'), 1.0,
+                              {'kind': 'rebar', 'part': r_type.split('_')[0], 'type': r_type, 'dia': int(dia), 'mirror': mirror}, matrix))
+            for name, mesh, color, types in mark_meshes:
+                items.append((name, mesh, color, 1.0, {'kind': 'mark', 'types': types, 'mirror': mirror}, matrix))
+    return glb_bytes(items, quantize=True)
+
+
+def viewer_html(glb):
+    """ GLB → 컴포넌트 HTML (GLB 는 base64 로 포함, 타입 / 직경 목록은 GLB 노드 extras 에서 읽음) """
+    return (VIEWER_TEMPLATE.replace('__THREE__', THREE_VERSION)
+            .replace('__PARTS__', json.dumps(PARTS, ensure_ascii=False))
+            .replace('__GLB__', base64.b64encode(glb).decode()))
+
+
+VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<style>
+  html, body { margin: 0; height: 100%; overflow: hidden; font-family: sans-serif; }
+  #view { position: absolute; inset: 0; }
+  #bar { position: absolute; top: 6px; left: 6px; z-index: 1; padding: 4px 8px; font-size: 13px;
+         background: rgba(240, 240, 240, 0.9); border: 1px solid #aaa; border-radius: 6px; }
+  #bar label { margin-right: 8px; white-space: nowrap; }
+  #bar input[type=range] { width: 70px; vertical-align: middle; }
+  #status { position: absolute; bottom: 6px; left: 8px; font-size: 12px; color: #555; }
+</style>
+<script type="importmap">
+  {"imports": {"three": "https://cdn.jsdelivr.net/npm/three@__THREE__/build/three.module.js",
+               "three/addons/": "https://cdn.jsdelivr.net/npm/three@__THREE__/examples/jsm/"}}
+</script>
+</head>
+<body>
+<div id="view"></div><div id="bar"></div><div id="status">loading…</div>
+<script type="module">
+import * as THREE from 'three';
+import { GLTFLoader } from 'three/addons/loaders/GLTFLoader.js';
+import { OrbitControls } from 'three/addons/controls/OrbitControls.js';
+
+const PARTS = __PARTS__;
+const VIEWS = { iso: [-1, -1, 1], Top: [0, 0, 1], Bottom: [0, 0, -1], Front: [0, -1, 0], Back: [0, 1, 0],
+                Right: [1, 0, 0], Left: [-1, 0, 0] };
+const DEFAULTS = { part: 'all', type: 'All', dia: 'All', mirror: false, projection: 'orthographic', camera: 'iso',
+                   rebarOpacity: 1, volumeOpacity: 0.3 };
+const STORAGE_KEY = 'coping_viewer_state';   // 도구 막대 상태 (iframe 을 다시 불러와도 유지)
+function loadState() {
+  try { return { ...DEFAULTS, ...JSON.parse(sessionStorage.getItem(STORAGE_KEY) || '{}') }; }
+  catch (e) { return { ...DEFAULTS }; }   // sandbox 등으로 저장소를 쓸 수 없으면 기본값
+}
+function saveState() {
+  try { sessionStorage.setItem(STORAGE_KEY, JSON.stringify(state)); } catch (e) {}
+}
+const state = loadState();
+
+// ---------- 장면, 카메라 (z 축 위쪽) ----------
+const view = document.getElementById('view');
+const renderer = new THREE.WebGLRenderer({ antialias: true });
+renderer.setPixelRatio(window.devicePixelRatio);
+renderer.setClearColor(0xffffff);
+view.appendChild(renderer.domElement);
+const scene = new THREE.Scene();
+scene.add(new THREE.AmbientLight(0xffffff, 1.0));
+const light = new THREE.DirectionalLight(0xffffff, 1.5);
+scene.add(light, light.target);
+const cameras = { perspective: new THREE.PerspectiveCamera(30, 1, 1, 1e7),
+                  orthographic: new THREE.OrthographicCamera(-1, 1, 1, -1, -1e7, 1e7) };
+let camera = cameras[state.projection] || cameras.orthographic;
+const controls = new OrbitControls(camera, renderer.domElement);
+let radius = 1;
+
+function render() {
+  light.position.copy(camera.position);   // 카메라 방향 조명
+  light.target.position.copy(controls.target);
+  renderer.render(scene, camera);
+}
+controls.addEventListener('change', render);
+
+function resize() {
+  const w = view.clientWidth, h = view.clientHeight, aspect = w / h;
+  renderer.setSize(w, h);
+  cameras.perspective.aspect = aspect;
+  const ortho = cameras.orthographic;
+  const half = (ortho.top - ortho.bottom) / 2;
+  Object.assign(ortho, { left: -half * aspect, right: half * aspect });
+  for (const c of Object.values(cameras)) c.updateProjectionMatrix();
+  render();
+}
+window.addEventListener('resize', resize);
+
+// ---------- 필터 / 스타일 (브라우저에서만 변경) ----------
+let objects = [];
+function visible(d) {
+  if (d.mirror && !(state.mirror && state.part === 'all')) return false;   // 대칭은 전체 뷰에서만
+  if (d.kind === 'volume' || d.kind === 'lines') return state.part === 'all' || d.part === state.part;
+  const types = d.kind === 'rebar' ? [d.type] : d.types;
+  if (state.part !== 'all' && !types.some(t => t.includes(state.part))) return false;
+  if (state.type !== 'All' && !types.includes(state.type)) return false;
+  return d.kind !== 'rebar' || state.dia === 'All' || String(d.dia) === state.dia;
+}
+function applyFilter() {
+  saveState();
+  for (const o of objects) {
+    const d = o.userData;
+    o.visible = visible(d);
+    const opacity = d.kind === 'rebar' ? state.rebarOpacity : d.kind === 'mark' ? 1 : state.volumeOpacity;
+    Object.assign(o.material, { opacity, transparent: opacity < 1, depthWrite: opacity >= 1 });
+  }
+  render();
+}
+
+function frame() {
+  // 보이는 객체 범위에 맞춰 카메라 위치 (두 카메라 모두)
+  const box = new THREE.Box3();
+  for (const o of objects) if (o.visible) box.expandByObject(o);
+  if (box.isEmpty()) return render();
+  const center = box.getCenter(new THREE.Vector3());
+  radius = box.getSize(new THREE.Vector3()).length() / 2;
+  const dir = new THREE.Vector3(...VIEWS[state.camera]).normalize();
+  const up = state.camera === 'Top' || state.camera === 'Bottom' ? [0, 1, 0] : [0, 0, 1];
+  const persp = cameras.perspective;
+  const distance = radius / Math.sin(THREE.MathUtils.degToRad(persp.fov / 2));
+  for (const c of Object.values(cameras)) {
+    c.up.set(...up);
+    c.position.copy(center).addScaledVector(dir, distance);
+    c.lookAt(center);
+  }
+  Object.assign(persp, { near: distance / 100, far: distance * 100 });
+  const ortho = cameras.orthographic, aspect = persp.aspect;
+  Object.assign(ortho, { top: radius, bottom: -radius, left: -radius * aspect, right: radius * aspect, zoom: 1 });
+  for (const c of Object.values(cameras)) c.updateProjectionMatrix();
+  controls.target.copy(center);
+  controls.update();
+  render();
+}
+
+function setProjection(name) {
+  // 같은 위치 / 방향에서 투영만 변경 (직교 뷰 크기는 원근 뷰의 초점 거리 시야에 맞춤)
+  const next = cameras[name];
+  next.position.copy(camera.position);
+  next.up.copy(camera.up);
+  if (name === 'orthographic') {
+    const d = camera.position.distanceTo(controls.target);
+    next.zoom = radius / (d * Math.tan(THREE.MathUtils.degToRad(cameras.perspective.fov / 2)));
+  }
+  next.updateProjectionMatrix();
+  camera = next;
+  controls.object = camera;
+  controls.update();
+  state.projection = name;
+  saveState();
+  render();
+}
+
+// ---------- 도구 막대 ----------
+function select(label, values, current, onChange) {
+  const el = document.createElement('label');
+  el.textContent = label + ' ';
+  const s = document.createElement('select');
+  for (const [value, text] of values) s.add(new Option(text, value, false, String(value) === String(current)));
+  s.onchange = () => onChange(s.value);
+  el.append(s);
+  return el;
+}
+function range(label, value, onChange) {
+  const el = document.createElement('label');
+  el.textContent = label + ' ';
+  const r = Object.assign(document.createElement('input'), { type: 'range', min: 0, max: 1, step: 0.1, value });
+  r.oninput = () => onChange(Number(r.value));
+  el.append(r);
+  return el;
+}
+function toolbar(types, dias) {
+  const bar = document.getElementById('bar');
+  const mirror = document.createElement('label');
+  const mirrorBox = Object.assign(document.createElement('input'), { type: 'checkbox', checked: state.mirror });
+  mirrorBox.onchange = () => { state.mirror = mirrorBox.checked; applyFilter(); frame(); };
+  mirror.append(mirrorBox, ' 대칭');
+  bar.append(
+    select('부위', Object.entries(PARTS), state.part, v => { state.part = v; applyFilter(); frame(); }),
+    select('타입', [['All', 'All'], ...types.map(t => [t, t])], state.type, v => { state.type = v; applyFilter(); }),
+    select('직경', [['All', 'All'], ...dias.map(d => [d, 'D' + d])], state.dia, v => { state.dia = v; applyFilter(); }),
+    mirror,
+    select('투영', [['orthographic', '직교'], ['perspective', '원근']], state.projection, setProjection),
+    select('카메라', Object.keys(VIEWS).map(v => [v, v]), state.camera, v => { state.camera = v; saveState(); frame(); }),
+    range('철근', state.rebarOpacity, v => { state.rebarOpacity = v; applyFilter(); }),
+    range('콘크리트', state.volumeOpacity, v => { state.volumeOpacity = v; applyFilter(); }),
+  );
+}
+
+// ---------- GLB 불러오기 ----------
+const buffer = await (await fetch('data:application/octet-stream;base64,__GLB__')).arrayBuffer();
+const gltf = await new GLTFLoader().parseAsync(buffer, '');
+scene.add(gltf.scene);
+gltf.scene.traverse(o => {
+  if (!o.userData.kind) return;
+  const color = o.material.color.clone();
+  if (o.isLineSegments || o.isLine) o.material = new THREE.LineBasicMaterial({ color });
+  else if (o.isPoints) o.material = new THREE.PointsMaterial({ color, size: 8, sizeAttenuation: false });
+  else o.material = new THREE.MeshPhongMaterial({ color, flatShading: true, side: THREE.DoubleSide });
+  objects.push(o);
+});
+document.getElementById('status').textContent = `${(buffer.byteLength / 1024 ** 2).toFixed(1)} MB, ${objects.length} objects`;
+
+// 타입 / 직경 목록 : 철근 노드 extras (저장된 선택이 이 모델에 없으면 All)
+const rebars = objects.map(o => o.userData).filter(d => d.kind === 'rebar');
+const types = [...new Set(rebars.map(d => d.type))].sort();
+const dias = [...new Set(rebars.map(d => d.dia))].sort((a, b) => a - b).map(String);
+if (!types.includes(state.type)) state.type = 'All';
+if (!dias.includes(state.dia)) state.dia = 'All';
+if (!(state.part in PARTS)) state.part = 'all';
+if (!(state.camera in VIEWS)) state.camera = 'iso';
+if (!(state.projection in cameras)) state.projection = 'orthographic';
+toolbar(types, dias);
+applyFilter();
+resize();
+frame();
+setProjection(state.projection);
+</script>
+</body></html>
+"""